@@ -0,0 +1,129 @@
+"""Compara la memoria de las canciones como lista de tuplas y como SongStore.
+
+Uso: python benchmarks/bench_memory.py [--sizes 10000 100000 1000000] [--analysis words]
+                                       [-o resultados.json]
+
+Las canciones se generan en memoria con los mismos títulos, artistas y carpetas que
+synthlib.py (sin escribir archivos), con cadenas nuevas para cada canción como las
+que devuelve la lectura de etiquetas. Para cada representación se mide con
+tracemalloc lo que ocupan las canciones ya cargadas y el pico del análisis completo
+(títulos limpios, palabras, grupos y tuplas de los grupos).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from repetiscan.blacklist import DEFAULT_BLACKLIST, get_normalizer, invalidate_normalizer
+from repetiscan.session import ScanSession
+from repetiscan.similarity import iter_ratio_groups, iter_word_groups
+from repetiscan.songstore import SongStore
+from synthlib import iter_tracks
+
+ROOT = os.path.join(os.sep, "music")
+KINDS = ("tuples", "store")
+DEFAULT_SIZES = (10000, 100000)
+
+
+def iter_songs(count, seed):
+    # (title, path, artist) como los da scan_songs: cada cadena es un objeto nuevo
+    for k, (artist, album, number, title) in enumerate(iter_tracks(count, seed)):
+        path = os.path.join(ROOT, artist, album, f"{number:02d} - {title} [{k}].mp3")
+        yield title.encode().decode(), path, artist.encode().decode()
+
+
+def load(kind, count, seed):
+    if kind == "tuples":
+        return list(iter_songs(count, seed))
+    return ScanSession(ROOT, SongStore(iter_songs(count, seed)))
+
+
+def analyse(kind, loaded, analysis, args):
+    # Lo mismo que hacía core.py con la lista de tuplas y lo que hace ahora con la sesión
+    blacklist = dict(DEFAULT_BLACKLIST)
+    if kind == "tuples":
+        songs = loaded
+        clean = get_normalizer(blacklist).clean
+        cleaned = [clean(title) for title, _, _ in songs]
+        token_sets = [set(c.split()) for c in cleaned] if analysis == "words" else None
+    else:
+        songs = loaded.songs
+        cleaned = loaded.cleaned(blacklist)
+        token_sets = loaded.token_sets(blacklist) if analysis == "words" else None
+    if analysis == "words":
+        groups = iter_word_groups(cleaned, args.min_overlap, token_sets=token_sets)
+    elif analysis == "ratio":
+        groups = iter_ratio_groups(cleaned, args.threshold)
+    else:
+        groups = ()
+    return cleaned, token_sets, [[songs[k] for k in group] for group in groups]
+
+
+def measure(kind, size, args):
+    gc.collect()
+    invalidate_normalizer()
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = load(kind, size, args.seed)
+    load_seconds = time.perf_counter() - start
+    gc.collect()
+    songs_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = analyse(kind, loaded, args.analysis, args)
+    analysis_seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    groups = sum(1 for group in result[2] if len(group) > 1)
+    del loaded, result
+    return {"kind": kind, "size": size, "songs_bytes": songs_bytes, "bytes_per_song": round(songs_bytes / size, 1),
+            "analysis_peak_bytes": peak, "load_seconds": round(load_seconds, 3),
+            "analysis_seconds": round(analysis_seconds, 3), "groups": groups}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--analysis", choices=("words", "ratio", "none"), default="words",
+                        help="análisis que se mide después de cargar (ratio es lento en tamaños grandes)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--min-overlap", type=int, default=2)
+    parser.add_argument("-o", "--output", help="archivo JSON de resultados")
+    args = parser.parse_args()
+
+    records = []
+    for size in args.sizes:
+        for kind in args.kinds:
+            record = measure(kind, size, args)
+            records.append(record)
+            print(f"{size:>8} {kind:6}  canciones {record['songs_bytes'] / 2**20:8.1f} MiB "
+                  f"({record['bytes_per_song']:6.1f} B/canción)  pico {args.analysis} "
+                  f"{record['analysis_peak_bytes'] / 2**20:8.1f} MiB  {record['analysis_seconds']:8.2f} s",
+                  file=sys.stderr)
+    result = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"seed": args.seed, "analysis": args.analysis, "threshold": args.threshold,
+                    "min_overlap": args.min_overlap},
+        "results": records,
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
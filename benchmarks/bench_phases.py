@@ -0,0 +1,160 @@
+"""Mide por separado cada fase del análisis sobre bibliotecas sintéticas.
+
+Uso: python benchmarks/bench_phases.py [--sizes 1000 10000 100000] [-o resultados.json]
+                                       [--compare anterior.json]
+
+Fases: get_mp3_titles, clean_title, find_similar_groups_by_ratio,
+find_similar_groups_by_words y group_songs_by_title. Para cada una se guarda el
+tiempo, los elementos por segundo y el pico de memoria (tracemalloc, en una
+segunda pasada para no inflar los tiempos). Con --compare se marcan las fases
+que han empeorado más de --tolerance respecto a otro resultado.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from repetiscan.blacklist import DEFAULT_BLACKLIST, clean_title, invalidate_normalizer
+from repetiscan.core import (find_similar_groups_by_ratio, find_similar_groups_by_words, get_mp3_titles,
+                             group_songs_by_title)
+from synthlib import generate_library
+
+PHASES = ("scan", "clean", "ratio", "words", "title")
+DEFAULT_SIZES = (1000, 10000)
+# Fases más rápidas que esto varían demasiado entre ejecuciones para compararlas
+MIN_COMPARE_SECONDS = 0.05
+
+
+def _phase(name, songs, args):
+    # Devuelve (función(stats) que ejecuta la fase, elementos procesados o None si se sabe al final)
+    blacklist = dict(DEFAULT_BLACKLIST)
+    if name == "scan":
+        return lambda stats: get_mp3_titles(args.folder, workers=args.workers), None
+    if name == "clean":
+        titles = [title for title, _, _ in songs]
+
+        def clean(stats):
+            # Sin caché previa: se mide la limpieza, no el lru_cache
+            invalidate_normalizer()
+            return [clean_title(title, blacklist) for title in titles]
+        return clean, len(titles)
+    if name == "ratio":
+        return lambda stats: find_similar_groups_by_ratio(songs, args.threshold, blacklist, stats, args.processes), len(songs)
+    if name == "words":
+        return lambda stats: find_similar_groups_by_words(songs, args.min_overlap, blacklist, stats,
+                                                          processes=args.processes), len(songs)
+    return lambda stats: group_songs_by_title(songs), len(songs)
+
+
+def run_phase(name, songs, args):
+    func, items = _phase(name, songs, args)
+    stats = {}
+    gc.collect()
+    start = time.perf_counter()
+    result = func(stats)
+    seconds = time.perf_counter() - start
+    if items is None:
+        items = len(result)
+    record = {"phase": name, "seconds": round(seconds, 6), "items": items,
+              "per_second": round(items / seconds, 1) if seconds else None}
+    if name in ("ratio", "words", "title"):
+        record["groups"] = sum(1 for group in result if len(group) > 1)
+    record.update(stats)
+    if args.memory:
+        gc.collect()
+        invalidate_normalizer()
+        tracemalloc.start()
+        func({})
+        record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return record, result
+
+
+def run_size(size, args):
+    args.folder = os.path.join(args.root, f"lib-{size}-s{args.seed}")
+    start = time.perf_counter()
+    generate_library(args.folder, size, args.seed)
+    print(f"== {size} archivos ({args.folder}, preparada en {time.perf_counter() - start:.1f} s)", file=sys.stderr)
+    records = []
+    songs = None
+    for name in args.phases:
+        if name != "scan" and songs is None:
+            songs = get_mp3_titles(args.folder, workers=args.workers)
+        record, result = run_phase(name, songs, args)
+        if name == "scan":
+            songs = result
+        record["size"] = size
+        records.append(record)
+        memory = f"  pico {record['peak_bytes'] / 2**20:8.1f} MiB" if "peak_bytes" in record else ""
+        print(f"{name:6} {record['seconds']:10.3f} s  {record['per_second'] or 0:12.1f} /s{memory}", file=sys.stderr)
+    return records
+
+
+def compare(records, baseline, tolerance):
+    # Fases más lentas que en baseline por encima de la tolerancia
+    previous = {(r["size"], r["phase"]): r for r in baseline["results"]}
+    regressions = []
+    for record in records:
+        old = previous.get((record["size"], record["phase"]))
+        if old is None or max(old["seconds"], record["seconds"]) < MIN_COMPARE_SECONDS:
+            continue
+        change = record["seconds"] / old["seconds"] - 1
+        mark = "  <-- más lento" if change > tolerance else ""
+        print(f"{record['size']:>7} {record['phase']:6} {old['seconds']:10.3f} s -> {record['seconds']:10.3f} s "
+              f"({change:+.1%}){mark}", file=sys.stderr)
+        if mark:
+            regressions.append(record)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES))
+    parser.add_argument("--root", default=os.path.join(tempfile.gettempdir(), "repetiscan-bench"),
+                        help="carpeta donde se generan (y reutilizan) las bibliotecas")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--min-overlap", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=8, help="hilos para leer etiquetas")
+    parser.add_argument("--processes", type=int, default=1, help="procesos para comparar (1 = un solo proceso)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="no medir el pico de memoria")
+    parser.add_argument("-o", "--output", help="archivo JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="empeoramiento permitido (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    records = []
+    for size in args.sizes:
+        records.extend(run_size(size, args))
+    result = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": {"seed": args.seed, "threshold": args.threshold, "min_overlap": args.min_overlap,
+                    "workers": args.workers, "processes": args.processes},
+        "results": records,
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            if compare(records, json.load(f), args.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
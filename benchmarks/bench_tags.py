@@ -0,0 +1,91 @@
+"""Compara el lector rápido de etiquetas con mutagen.MP3 + EasyID3.
+
+Uso: python benchmarks/bench_tags.py CARPETA [--limit N]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mutagen.easyid3 import EasyID3
+from mutagen.mp3 import MP3
+from repetiscan.scanner import iter_mp3_files
+from repetiscan.tagreader import read_title_artist
+
+
+class CountingFile(io.FileIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        CountingFile.bytes_read += len(data)
+        return data
+
+    def readinto(self, b):
+        n = super().readinto(b)
+        CountingFile.bytes_read += n or 0
+        return n
+
+
+def read_full(filepath):
+    with CountingFile(filepath, "r") as f:
+        audio = MP3(f, ID3=EasyID3)
+        title = audio.get("title", [os.path.splitext(os.path.basename(filepath))[0]])[0]
+        artist = audio.get("artist", [""])[0]
+    return title, artist
+
+
+def read_fast(filepath, stats):
+    tags = read_title_artist(filepath, stats)
+    if tags is None:
+        return read_full(filepath)
+    title, artist = tags
+    if title is None:
+        title = os.path.splitext(os.path.basename(filepath))[0]
+    return title, artist
+
+
+def run(name, paths, reader):
+    stats = {"bytes_read": 0}
+    CountingFile.bytes_read = 0
+    failures = 0
+    start = time.perf_counter()
+    results = []
+    for path in paths:
+        try:
+            results.append(reader(path, stats) if reader is read_fast else reader(path))
+        except Exception:
+            failures += 1
+            results.append(None)
+    elapsed = time.perf_counter() - start
+    bytes_read = stats["bytes_read"] + CountingFile.bytes_read
+    rate = len(paths) / elapsed if elapsed else float("inf")
+    print(f"{name:8} {len(paths):7d} archivos  {elapsed:8.3f} s  {rate:10.1f} archivos/s  "
+          f"{bytes_read / max(1, len(paths)):10.1f} bytes/archivo  {failures} errores")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder")
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = [p for p, _, _ in iter_mp3_files(args.folder)]
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        print("No se encontraron MP3.")
+        return 1
+    full = run("mutagen", paths, read_full)
+    fast = run("rápido", paths, read_fast)
+    diffs = sum(1 for a, b in zip(full, fast) if a is not None and a != b)
+    print(f"Resultados distintos: {diffs}")
+    return 0 if diffs == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
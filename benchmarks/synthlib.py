@@ -0,0 +1,144 @@
+"""Genera una biblioteca sintética de MP3 diminutos para los benchmarks.
+
+Uso: python benchmarks/synthlib.py CARPETA --count 10000 [--seed 1]
+
+Estructura Artista/Álbum/NN - Título.mp3 con etiquetas ID3v2.4 (TIT2, TPE1) y
+dos frames MPEG. Una parte de las pistas son versiones de títulos anteriores:
+sufijos "(Remastered)", "- Live", "(Radio Edit)"..., cambios de mayúsculas,
+erratas y copias exactas, a menudo con el mismo artista.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+MANIFEST = "synthlib.json"
+# Un frame MPEG-1 Layer III de 417 bytes (128 kbps, 44.1 kHz) en silencio
+FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+TRACKS_PER_ALBUM = 12
+ALBUMS_PER_ARTIST = 3
+
+WORDS = (
+    "love night dance baby rain fire heart blue sky road home girl boy moon sun dream light dark "
+    "summer winter city river ocean star time forever tonight money gold silver wild free young "
+    "lonely broken sweet crazy happy sad electric midnight morning shadow ghost angel devil paradise "
+    "highway train window mirror memory promise secret story song radio party kiss touch fever "
+    "thunder lightning storm desert island garden mountain valley street corner station letter "
+    "telephone holiday weekend sunday friday yesterday tomorrow always never again alone together "
+    "rock roll soul blues jazz funk disco golden diamond velvet purple red green white black"
+).split()
+FIRST_NAMES = ("The Los Black Blue Silver Golden Little Big Young Old Electric Midnight Velvet Crystal "
+               "Marta Carlos Ana John Paul Lucy Miguel Sara David Laura").split()
+LAST_NAMES = ("Stones Wolves Riders Hearts Kings Queens Brothers Sisters Rebels Dreamers Ghosts Angels "
+              "García Smith Jones Martín López Brown Taylor Fernández Wilson Moreno").split()
+SUFFIXES = ("(Remastered)", "(Remastered 2011)", "- Remastered", "- Live", "(Live)", "(Live at Wembley)",
+            "(Radio Edit)", "(Acoustic)", "(Demo)", "(Bonus Track)", "[Official Video]", "(feat. {artist})")
+
+# Proporción de pistas que son versión de un título anterior y de ellas, cómo
+VARIANT_RATE = 0.2
+VARIANT_KINDS = (("suffix", 0.55), ("copy", 0.2), ("case", 0.1), ("typo", 0.15))
+
+
+def _syncsafe(value):
+    return bytes(((value >> 21) & 0x7f, (value >> 14) & 0x7f, (value >> 7) & 0x7f, value & 0x7f))
+
+
+def _text_frame(frame_id, text):
+    data = b"\x03" + text.encode("utf-8")
+    return frame_id + _syncsafe(len(data)) + b"\x00\x00" + data
+
+
+def mp3_bytes(title, artist):
+    frames = _text_frame(b"TIT2", title) + _text_frame(b"TPE1", artist)
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frames)) + frames + FRAME * 2
+
+
+def _title(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+
+
+def _typo(rng, title):
+    if len(title) < 4:
+        return title + title[-1]
+    k = rng.randrange(1, len(title) - 1)
+    return title[:k] + title[k + 1] + title[k] + title[k + 2:]
+
+
+def _variant(rng, title, artists):
+    kind = rng.choices([k for k, _ in VARIANT_KINDS], [w for _, w in VARIANT_KINDS])[0]
+    if kind == "suffix":
+        return f"{title} {rng.choice(SUFFIXES).format(artist=rng.choice(artists))}"
+    if kind == "case":
+        return title.upper() if rng.random() < 0.5 else title.lower()
+    if kind == "typo":
+        return _typo(rng, title)
+    return title
+
+
+def iter_tracks(count, seed=1):
+    # (artista, álbum, número, título) deterministas para count y seed
+    rng = random.Random(seed)
+    n_artists = max(1, count // (TRACKS_PER_ALBUM * ALBUMS_PER_ARTIST))
+    artists = sorted({f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {k}" for k in range(n_artists)})
+    previous = []
+    for k in range(count):
+        album_index = k // TRACKS_PER_ALBUM
+        artist = artists[(album_index // ALBUMS_PER_ARTIST) % len(artists)]
+        album = f"Album {album_index % ALBUMS_PER_ARTIST + 1}"
+        if previous and rng.random() < VARIANT_RATE:
+            base_artist, base = rng.choice(previous)
+            # La mayoría de versiones son del mismo artista (recopilatorios, directos)
+            if rng.random() < 0.7:
+                artist = base_artist
+            title = _variant(rng, base, artists)
+        else:
+            title = _title(rng)
+            previous.append((artist, title))
+        yield artist, album, k % TRACKS_PER_ALBUM + 1, title
+
+
+def _safe_name(text):
+    return "".join("_" if c in '<>:"/\\|?*' else c for c in text)
+
+
+def generate_library(root, count, seed=1):
+    # Reutiliza la carpeta si ya se generó con los mismos parámetros; devuelve el número de archivos
+    manifest_path = os.path.join(root, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            if json.load(f) == {"count": count, "seed": seed}:
+                return count
+        raise ValueError(f"{root} se generó con otros parámetros")
+    if os.path.isdir(root) and os.listdir(root):
+        raise ValueError(f"{root} no está vacía y no es una biblioteca sintética")
+    os.makedirs(root, exist_ok=True)
+    for k, (artist, album, number, title) in enumerate(iter_tracks(count, seed)):
+        folder = os.path.join(root, _safe_name(artist), album)
+        os.makedirs(folder, exist_ok=True)
+        # El índice global evita choques de nombre entre versiones del mismo álbum
+        name = f"{number:02d} - {_safe_name(title)} [{k}].mp3"
+        with open(os.path.join(folder, name), "wb") as f:
+            f.write(mp3_bytes(title, artist))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"count": count, "seed": seed}, f)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    try:
+        generate_library(args.folder, args.count, args.seed)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"{args.count} archivos en {args.folder}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
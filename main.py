@@ -1,7 +1,10 @@
+import multiprocessing
 import customtkinter
 from repetiscan.gui import SimilarityApp
 
 if __name__ == "__main__":
+    # Necesario para la comparación en varios procesos en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     root = customtkinter.CTk()
     app = SimilarityApp(root)
     root.mainloop()
\ No newline at end of file
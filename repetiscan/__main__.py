@@ -0,0 +1,117 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from repetiscan.api import MODES, iter_scan
+from repetiscan.blacklist import DEFAULT_BLACKLIST
+from repetiscan.cache import TagCache
+from repetiscan.export import FORMATS, GroupExporter, format_for
+from repetiscan.jobs import SyncJob
+from repetiscan.parallel import DEFAULT_PROCESSES
+from repetiscan.scanner import DEFAULT_WORKERS
+
+# Códigos de salida: 0 sin duplicados, 1 duplicados encontrados, 2 error, 130 interrumpido
+EXIT_OK = 0
+EXIT_FOUND = 1
+EXIT_ERROR = 2
+EXIT_INTERRUPTED = 130
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="repetiscan", description="Busca canciones MP3 repetidas o similares sin interfaz gráfica.")
+    parser.add_argument("folder", help="carpeta a analizar (incluye subcarpetas)")
+    parser.add_argument("--mode", choices=MODES, default="ratio")
+    parser.add_argument("--threshold", type=float, default=0.8, help="similitud mínima para --mode ratio (0.0 - 1.0)")
+    parser.add_argument("--min-overlap", type=int, default=2, help="palabras mínimas en común para --mode words")
+    parser.add_argument("--exclude-artist", default="", help="artista a excluir para --mode not_artist")
+    parser.add_argument("--blacklist", help="archivo JSON con la blacklist (por defecto, la blacklist inicial)")
+    parser.add_argument("--format", choices=FORMATS, help="por defecto, según la extensión de --output (.csv, .jsonl); jsonl con otras extensiones y en stdout")
+    parser.add_argument("-o", "--output", help="archivo de salida (por defecto, stdout); con .gz se comprime")
+    parser.add_argument("--gzip", action="store_true", help="comprimir la salida con gzip aunque no acabe en .gz")
+    parser.add_argument("--no-size", dest="sizes", action="store_false", help="no consultar el tamaño de cada archivo")
+    parser.add_argument("--cache", help="archivo SQLite de caché de etiquetas")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="hilos para leer etiquetas")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES, help="procesos para comparar títulos (1 = un solo proceso)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no mostrar el resumen en stderr")
+    parser.add_argument("--trace", metavar="JSON", help="guardar tiempos por fase y contadores (formato Trace Event)")
+    parser.add_argument("--profile", metavar="PROF", help="perfilar el análisis con cProfile y guardar el resultado")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.folder):
+        print(f"repetiscan: no es una carpeta: {args.folder}", file=sys.stderr)
+        return EXIT_ERROR
+    try:
+        if args.blacklist:
+            with open(args.blacklist, "r", encoding="utf-8") as f:
+                blacklist = json.load(f)
+            # Mismo formato que blacklist.json: {"palabra": true/false}
+            if not isinstance(blacklist, dict) or not all(isinstance(k, str) and isinstance(v, bool) for k, v in blacklist.items()):
+                raise ValueError(f"{args.blacklist}: la blacklist debe ser un objeto JSON {{\"palabra\": true/false}}")
+        else:
+            blacklist = dict(DEFAULT_BLACKLIST)
+        cache = TagCache(args.cache) if args.cache else None
+        if args.output:
+            # Con una extensión desconocida se sigue escribiendo JSONL, como antes de haber CSV
+            fmt = args.format or format_for(args.output, default="jsonl")[0]
+            writer = GroupExporter(args.output, fmt, args.mode, blacklist, args.gzip or None, args.sizes)
+        else:
+            writer = GroupExporter(sys.stdout, args.format or "jsonl", args.mode, blacklist, args.gzip, args.sizes)
+    except Exception as e:
+        # Cualquier fallo al preparar (caché SQLite dañada, JSON inválido...) es un error, no "duplicados"
+        print(f"repetiscan: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    errors = []
+    job = SyncJob(cprofile=bool(args.profile))
+    start = time.monotonic()
+    status = EXIT_OK
+    try:
+        for group in iter_scan(args.folder, args.mode, threshold=args.threshold, min_overlap=args.min_overlap,
+                               excluded_artist=args.exclude_artist, blacklist=blacklist, cache=cache,
+                               errors=errors, job=job, workers=args.workers,
+                               processes=args.processes):
+            writer.write(group)
+            if not args.output:
+                # Quien lee la tubería recibe cada grupo en cuanto se encuentra
+                writer.flush()
+        if writer.count:
+            status = EXIT_FOUND
+    except KeyboardInterrupt:
+        status = EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"repetiscan: {e}", file=sys.stderr)
+        status = EXIT_ERROR
+    finally:
+        try:
+            writer.close()
+        except OSError as e:
+            print(f"repetiscan: {e}", file=sys.stderr)
+            status = EXIT_ERROR
+        if cache is not None:
+            cache.close()
+
+    try:
+        if args.trace:
+            job.profile.write_trace(args.trace)
+        top = job.profile.dump_cprofile(args.profile) if args.profile else ""
+    except OSError as e:
+        print(f"repetiscan: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if not args.quiet:
+        print(f"repetiscan: {writer.count} grupos en {time.monotonic() - start:.2f} s · {job.profile.report()}", file=sys.stderr)
+        for error in errors:
+            print(f"repetiscan: error leyendo {error.path}: {error.message}", file=sys.stderr)
+        if top:
+            print(top, file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
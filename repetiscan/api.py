@@ -0,0 +1,54 @@
+from repetiscan.blacklist import DEFAULT_BLACKLIST
+from repetiscan.core import iter_ratio_analysis, iter_words_analysis, iter_not_artist_analysis, iter_content_analysis
+from repetiscan.export import GroupExporter
+from repetiscan.jobs import SyncJob
+from repetiscan.parallel import DEFAULT_PROCESSES
+from repetiscan.scanner import DEFAULT_WORKERS
+
+# API sin interfaz gráfica: no importa Tk ni CTkMessagebox
+
+MODES = ("ratio", "words", "not_artist", "content")
+
+
+def iter_scan(folder, mode="ratio", threshold=0.8, min_overlap=2, excluded_artist="",
+              blacklist=None, cache=None, errors=None, job=None, workers=DEFAULT_WORKERS, session=None,
+              processes=DEFAULT_PROCESSES):
+    # Genera los grupos a medida que se encuentran: listas de (title, path, artist).
+    # Con session (job.session de una llamada anterior) no se vuelve a leer la carpeta.
+    # processes: procesos para comparar en los modos ratio y words (1 = sin repartir).
+    if mode not in MODES:
+        raise ValueError(f"Modo desconocido: {mode}")
+    if blacklist is None:
+        blacklist = DEFAULT_BLACKLIST
+    if job is None:
+        job = SyncJob()
+    if mode == "ratio":
+        groups = iter_ratio_analysis(job, folder, cache, threshold, blacklist, errors, keep_graph=False, workers=workers, session=session, processes=processes)
+    elif mode == "words":
+        groups = iter_words_analysis(job, folder, cache, min_overlap, blacklist, errors, keep_graph=False, workers=workers, session=session, processes=processes)
+    elif mode == "not_artist":
+        groups = iter_not_artist_analysis(job, folder, cache, excluded_artist.strip().lower(), errors, workers, session)
+    else:
+        groups = iter_content_analysis(job, folder, cache, errors, workers, session)
+    try:
+        for group in groups:
+            job.groups += 1
+            yield group
+    finally:
+        if isinstance(job, SyncJob):
+            job.finish()
+
+
+def scan(folder, mode="ratio", threshold=0.8, blacklist=None, **options):
+    return list(iter_scan(folder, mode, threshold=threshold, blacklist=blacklist, **options))
+
+
+def export_scan(folder, output, mode="ratio", fmt=None, compress=None, blacklist=None, **options):
+    # Analiza y escribe cada grupo en output (ruta o flujo) según llega, sin guardar la lista;
+    # devuelve el número de grupos. Mismas opciones que iter_scan.
+    if blacklist is None:
+        blacklist = DEFAULT_BLACKLIST
+    with GroupExporter(output, fmt, mode, blacklist, compress) as exporter:
+        for group in iter_scan(folder, mode, blacklist=blacklist, **options):
+            exporter.write(group)
+    return exporter.count
@@ -1,50 +1,65 @@
-import tkinter as tk
-import customtkinter
 import json
 import os
+import re
+from functools import lru_cache
 
-check_vars = {}
+# Normalizador compilado de la blacklist actual; se invalida al cambiar la blacklist
+_normalizer = None
+_blacklist_version = 0
 
 
 BLACKLIST_FILE = "blacklist.json"
 
-def load_blacklist():
-    if not os.path.exists(BLACKLIST_FILE):
-        default = {"remastered": True, "live": True, "bonus track": False, "demo": False, "radio edit": True}
-        with open(BLACKLIST_FILE, 'w', encoding='utf-8') as f:
-            json.dump(default, f, indent=4)
-    with open(BLACKLIST_FILE, 'r', encoding='utf-8') as f:
+DEFAULT_BLACKLIST = {"remastered": True, "live": True, "bonus track": False, "demo": False, "radio edit": True}
+
+def load_blacklist(path=BLACKLIST_FILE):
+    if not os.path.exists(path):
+        save_blacklist(dict(DEFAULT_BLACKLIST), path)
+    with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def save_blacklist(blacklist, path=BLACKLIST_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(blacklist, f, indent=4)
+
+class BlacklistNormalizer:
+    """Versión compilada de clean_title para una blacklist concreta."""
+
+    def __init__(self, blacklist, version=0, cache_size=65536):
+        self.source = blacklist
+        self.version = version
+        self.words = [word for word, active in blacklist.items() if active]
+        if self.words:
+            alternatives = sorted(self.words, key=len, reverse=True)
+            self.pattern = re.compile("|".join(re.escape(word) for word in alternatives))
+        else:
+            self.pattern = None
+        self.clean = lru_cache(maxsize=cache_size)(self._clean)
+
+    def _clean(self, title):
+        lowered = title.lower()
+        # Casi ningún título contiene palabras de la blacklist: una sola búsqueda basta
+        if self.pattern is None or self.pattern.search(lowered) is None:
+            return lowered.strip()
+        # Mismo orden de reemplazos que antes: quitar una palabra puede formar otra
+        for word in self.words:
+            if word in lowered:
+                lowered = lowered.replace(word, '')
+        return lowered.strip()
+
+
+def invalidate_normalizer():
+    global _normalizer, _blacklist_version
+    _blacklist_version += 1
+    _normalizer = None
+
+
+def get_normalizer(blacklist):
+    global _normalizer
+    if _normalizer is None or _normalizer.source is not blacklist or _normalizer.version != _blacklist_version:
+        _normalizer = BlacklistNormalizer(blacklist, _blacklist_version)
+    return _normalizer
+
+
 def clean_title(title, blacklist):
-    lowered = title.lower()
-    for word, active in blacklist.items():
-        if active and word in lowered:
-            lowered = lowered.replace(word, '')
-    return lowered.strip()
-
-def add_word(new_word_var, selfie, frame):
-    new_word = new_word_var.get().strip().lower()
-    if new_word and new_word not in selfie.blacklist:
-        selfie.blacklist[new_word] = True
-        refresh_checkboxes(frame, selfie)
-        new_word_var.set("")
-
-def refresh_checkboxes(frame, self):
-    for widget in frame.winfo_children():
-        widget.destroy()
-    check_vars.clear()
-    for word, active in self.blacklist.items():
-        var = tk.BooleanVar(value=active)
-        chk = customtkinter.CTkCheckBox(frame, text=word, variable=var)
-        chk.pack(anchor='w')
-        check_vars[word] = var
-
-
-
-def save_and_close(editor, self):
-    for word, var in check_vars.items():
-        self.blacklist[word] = var.get()
-    with open(BLACKLIST_FILE, 'w', encoding='utf-8') as f:
-        json.dump(self.blacklist, f, indent=4)
-    editor.destroy()
\ No newline at end of file
+    return get_normalizer(blacklist).clean(title)
@@ -0,0 +1,35 @@
+import tkinter as tk
+import customtkinter
+from repetiscan.blacklist import invalidate_normalizer, save_blacklist
+
+check_vars = {}
+
+
+def add_word(new_word_var, selfie, frame):
+    new_word = new_word_var.get().strip().lower()
+    if new_word and new_word not in selfie.blacklist:
+        selfie.blacklist[new_word] = True
+        invalidate_normalizer()
+        selfie.graph = None
+        refresh_checkboxes(frame, selfie)
+        new_word_var.set("")
+
+def refresh_checkboxes(frame, self):
+    for widget in frame.winfo_children():
+        widget.destroy()
+    check_vars.clear()
+    for word, active in self.blacklist.items():
+        var = tk.BooleanVar(value=active)
+        chk = customtkinter.CTkCheckBox(frame, text=word, variable=var)
+        chk.pack(anchor='w')
+        check_vars[word] = var
+
+
+
+def save_and_close(editor, self):
+    for word, var in check_vars.items():
+        self.blacklist[word] = var.get()
+    invalidate_normalizer()
+    self.graph = None  # los títulos limpios cambian: el grafo ya no vale
+    save_blacklist(self.blacklist)
+    editor.destroy()
\ No newline at end of file
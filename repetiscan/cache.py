@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+
+# Se guarda junto a blacklist.json
+CACHE_FILE = "tag_cache.db"
+
+
+class TagCache:
+    """Caché en disco de (title, artist) por archivo, con clave path + size + mtime."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = None
+        self._pending = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tags ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, title TEXT, artist TEXT)"
+        )
+        self._conn.commit()
+
+    def _load(self):
+        # Se carga todo de una vez: una consulta por archivo es más lenta que un dict
+        if self._entries is None:
+            rows = self._conn.execute("SELECT path, size, mtime, title, artist FROM tags")
+            self._entries = {path: (size, mtime, title, artist) for path, size, mtime, title, artist in rows}
+        return self._entries
+
+    def get(self, path, size, mtime):
+        with self._lock:
+            entry = self._load().get(path)
+            if entry is not None and entry[0] == size and entry[1] == mtime:
+                self.hits += 1
+                return entry[2], entry[3]
+            self.misses += 1
+            return None
+
+    def put(self, path, size, mtime, title, artist):
+        with self._lock:
+            self._load()[path] = (size, mtime, title, artist)
+            self._pending.append((path, size, mtime, title, artist))
+
+    def commit(self):
+        with self._lock:
+            if not self._pending:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tags (path, size, mtime, title, artist) VALUES (?, ?, ?, ?, ?)",
+                self._pending
+            )
+            self._conn.commit()
+            self._pending = []
+
+    def invalidate(self, path):
+        with self._lock:
+            self._load().pop(path, None)
+            self._pending = [row for row in self._pending if row[0] != path]
+            self._conn.execute("DELETE FROM tags WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def rebuild(self):
+        # Vacía la caché: el próximo escaneo vuelve a leer todas las etiquetas
+        with self._lock:
+            self._conn.execute("DELETE FROM tags")
+            self._conn.commit()
+            self._entries = {}
+            self._pending = []
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._load())}
+
+    def close(self):
+        self.commit()
+        self._conn.close()
@@ -0,0 +1,119 @@
+import hashlib
+import mmap
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from repetiscan.scanner import DEFAULT_WORKERS, ScanError
+
+# Duplicados por contenido en etapas, para que casi ningún archivo se lea entero:
+#   1. tamaño del audio (archivo sin etiquetas ID3v2 / APEv2 / ID3v1)
+#   2. hash del principio y el final del audio
+#   3. hash completo del audio con mmap
+# Se comparan sólo los bytes de audio, así que dos copias con etiquetas distintas coinciden.
+
+PARTIAL_SIZE = 8192
+CHUNK_SIZE = 1 << 20
+
+
+def audio_span(filepath):
+    # (inicio, fin) de los datos de audio dentro del archivo
+    with open(filepath, "rb") as f:
+        size = f.seek(0, 2)
+        start, end = 0, size
+        f.seek(0)
+        header = f.read(10)
+        if len(header) == 10 and header[:3] == b"ID3" and not any(b & 0x80 for b in header[6:10]):
+            tag_size = 0
+            for b in header[6:10]:
+                tag_size = (tag_size << 7) | b
+            start = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+        if end - start >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b"TAG":
+                end -= 128
+        if end - start >= 32:
+            f.seek(end - 32)
+            footer = f.read(32)
+            if footer[:8] == b"APETAGEX":
+                ape_size = int.from_bytes(footer[12:16], "little")
+                flags = int.from_bytes(footer[20:24], "little")
+                end -= ape_size + (32 if flags & 0x80000000 else 0)
+    return start, max(start, end)
+
+
+def partial_hash(filepath, start, end):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        digest.update(f.read(min(PARTIAL_SIZE, end - start)))
+        if end - start > PARTIAL_SIZE:
+            tail = max(start + PARTIAL_SIZE, end - PARTIAL_SIZE)
+            f.seek(tail)
+            digest.update(f.read(end - tail))
+    return digest.digest()
+
+
+def full_hash(filepath, start, end):
+    digest = hashlib.blake2b()
+    with open(filepath, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for offset in range(start, end, CHUNK_SIZE):
+                    digest.update(view[offset:min(end, offset + CHUNK_SIZE)])
+            finally:
+                view.release()
+    return digest.digest()
+
+
+def _refine(buckets, key_func, pool, errors, stats=None, stat_name=None, progress=None):
+    # Divide cada cubo con más de un archivo según key_func(path, start, end).
+    # progress(hechos, archivos a hashear) por cada hash terminado; si lanza una
+    # excepción (cancelar), no se empiezan los que faltan
+    refined = {}
+    jobs = [(key, item) for key, items in buckets.items() if len(items) > 1 for item in items]
+    futures = [pool.submit(key_func, item[1], item[2], item[3]) for _, item in jobs]
+    if progress is not None:
+        try:
+            for done, _ in enumerate(as_completed(futures), 1):
+                progress(done, len(futures))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    for (key, item), future in zip(jobs, futures):
+        try:
+            digest = future.result()
+        except (OSError, ValueError) as e:
+            if errors is not None:
+                errors.append(ScanError(item[1], str(e)))
+            continue
+        refined.setdefault((key, digest), []).append(item)
+        if stats is not None:
+            stats[stat_name] = stats.get(stat_name, 0) + 1
+            stats["bytes_hashed"] = stats.get("bytes_hashed", 0) + (
+                item[3] - item[2] if key_func is full_hash else min(item[3] - item[2], 2 * PARTIAL_SIZE))
+    return refined
+
+
+def iter_content_groups(paths, workers=DEFAULT_WORKERS, errors=None, stats=None, progress=None):
+    # Genera listas de índices de paths con el mismo audio
+    n = len(paths)
+    buckets = {}
+    for k, path in enumerate(paths):
+        if progress is not None and not k & 63:
+            progress(k, n)
+        try:
+            start, end = audio_span(path)
+        except OSError as e:
+            if errors is not None:
+                errors.append(ScanError(path, str(e)))
+            continue
+        if end > start:
+            buckets.setdefault(end - start, []).append((k, path, start, end))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        buckets = _refine(buckets, partial_hash, pool, errors, stats, "files_hashed_partial", progress)
+        buckets = _refine(buckets, full_hash, pool, errors, stats, "files_hashed_full", progress)
+    if progress is not None:
+        progress(n, n)
+    groups = [sorted(item[0] for item in items) for items in buckets.values() if len(items) > 1]
+    yield from sorted(groups)
@@ -1,24 +1,15 @@
-import os
-from CTkMessagebox import CTkMessagebox
-from repetiscan.language import t
-from mutagen.easyid3 import EasyID3
-from mutagen.mp3 import MP3
 import difflib
-from repetiscan.blacklist import clean_title
+from repetiscan.blacklist import clean_title, get_normalizer
+from repetiscan.similarity import iter_word_groups
+from repetiscan.contenthash import iter_content_groups
+from repetiscan.graph import SimilarityGraph, ratio_floor_for, word_floor_for
+from repetiscan.parallel import sharded_ratio_groups, sharded_word_groups
+from repetiscan.session import ScanSession
+from repetiscan.songstore import SongStore
+from repetiscan.scanner import scan_songs, DEFAULT_WORKERS
 
-def get_mp3_titles(folder):
-    songs = []
-    for filename in os.listdir(folder):
-        if filename.lower().endswith('.mp3'):
-            filepath = os.path.join(folder, filename)
-            try:
-                audio = MP3(filepath, ID3=EasyID3)
-                title = audio.get("title", [os.path.splitext(filename)[0]])[0]
-                artist = audio.get("artist", [""])[0]
-                songs.append((title, filepath, artist))
-            except Exception as e:
-                print(f"Error leyendo {filename}: {e}")
-    return songs
+def get_mp3_titles(folder, cache=None, workers=DEFAULT_WORKERS, errors=None):
+    return list(scan_songs(folder, workers=workers, cache=cache, errors=errors))
 
 def group_songs_by_title(songs):
     grouped = {}
@@ -28,7 +19,12 @@ def group_songs_by_title(songs):
         grouped[title].append((title, path, artist))
     return list(grouped.values())
 
-def find_similar_groups_by_ratio(songs, threshold, blacklist):
+def find_similar_groups_by_ratio(songs, threshold, blacklist, stats=None, processes=1):
+    clean = get_normalizer(blacklist).clean
+    cleaned = [clean(title) for title, _, _ in songs]
+    return [[songs[k] for k in group] for group in sharded_ratio_groups(cleaned, threshold, stats, processes=processes)]
+
+def find_similar_groups_by_ratio_exhaustive(songs, threshold, blacklist):
     groups = []
     seen = set()
     for i in range(len(songs)):
@@ -51,7 +47,16 @@ def find_similar_groups_by_ratio(songs, threshold, blacklist):
             groups.append(group)
     return groups
 
-def find_similar_groups_by_words(songs, min_overlap, blacklist):
+def find_similar_groups_by_words(songs, min_overlap, blacklist, stats=None, skip_tokens=None, max_postings=None, processes=1):
+    clean = get_normalizer(blacklist).clean
+    cleaned = [clean(title) for title, _, _ in songs]
+    if skip_tokens is None and max_postings is None:
+        groups = sharded_word_groups(cleaned, min_overlap, stats, processes=processes)
+    else:
+        groups = iter_word_groups(cleaned, min_overlap, stats, skip_tokens=skip_tokens, max_postings=max_postings)
+    return [[songs[k] for k in group] for group in groups]
+
+def find_similar_groups_by_words_exhaustive(songs, min_overlap, blacklist):
     groups = []
     seen = set()
     for i in range(len(songs)):
@@ -73,31 +78,89 @@ def find_similar_groups_by_words(songs, min_overlap, blacklist):
             groups.append(group)
     return groups
 
-def analyze_by_ratio(self):
-    self.current_mode = "ratio"
-    if not self.folder:
-        CTkMessagebox(title="Error", message=t("folder_error", self.lang, self.translations), icon="warning")
-        return
-    songs = get_mp3_titles(self.folder)
-    self.groups = find_similar_groups_by_ratio(songs, self.threshold.get(), self.blacklist)
-    self.show_groups_in_tree(self.groups)
+def regroup_songs(songs, mode, threshold, min_overlap, blacklist):
+    # Vuelve a agrupar un subconjunto (p. ej. lo que queda de un grupo tras borrar)
+    if mode == "ratio":
+        return find_similar_groups_by_ratio(songs, threshold, blacklist)
+    if mode == "words":
+        return find_similar_groups_by_words(songs, min_overlap, blacklist)
+    if mode == "content":
+        # Lo que queda de un grupo por contenido sigue teniendo el mismo audio
+        return [songs] if len(songs) > 1 else []
+    return group_songs_by_title(songs)
 
-def analyze_by_words(self):
-    self.current_mode = "words"
-    if not self.folder:
-        CTkMessagebox(title="Error", message=t("folder_error", self.lang, self.translations), icon="warning")
+def scan_with_progress(job, folder, cache=None, errors=None, workers=DEFAULT_WORKERS):
+    # Las canciones van directamente al SongStore: no se guarda ninguna tupla
+    songs = SongStore()
+    for song in scan_songs(folder, workers=workers, cache=cache, errors=errors, stats=job.stats):
+        songs.append(*song)
+        if not len(songs) & 63:
+            job.progress("scan", len(songs))
+    job.progress("scan", len(songs))
+    job.stats["files_scanned"] = len(songs)
+    job.stats["read_errors"] = len(errors) if errors is not None else 0
+    return songs
+
+def load_session(job, folder, cache, errors=None, workers=DEFAULT_WORKERS, session=None):
+    # Reutiliza el escaneo anterior de la misma carpeta; si no, escanea y crea la sesión
+    if session is not None and session.folder == folder:
+        if errors is not None:
+            errors.extend(session.errors)
+        job.progress("scan", len(session.songs))
+        job.stats["files_scanned"] = len(session.songs)
+        job.stats["read_errors"] = len(session.errors)
+    else:
+        scan_errors = [] if errors is None else errors
+        session = ScanSession(folder, scan_with_progress(job, folder, cache, scan_errors, workers), scan_errors)
+    job.session = session
+    return session
+
+def iter_ratio_analysis(job, folder, cache, threshold, blacklist, errors=None, keep_graph=True, workers=DEFAULT_WORKERS, session=None, processes=1):
+    session = load_session(job, folder, cache, errors, workers, session)
+    job.progress("clean", 0, len(session.songs))
+    # Store y títulos limpios a la vez: el modo vigilancia puede cambiar la sesión entre medias
+    with session.lock:
+        songs = session.songs
+        cleaned = session.cleaned(blacklist)
+    progress = lambda done, total: job.progress("compare", done, total)
+    floor_threshold = ratio_floor_for(threshold) if keep_graph else None
+    if floor_threshold is None:
+        for group in sharded_ratio_groups(cleaned, threshold, job.stats, progress, processes):
+            yield [songs[k] for k in group]
         return
-    songs = get_mp3_titles(self.folder)
-    self.groups = find_similar_groups_by_words(songs, self.min_overlap.get(), self.blacklist)
-    self.show_groups_in_tree(self.groups)
+    # Se guardan también las aristas algo por debajo del umbral para reagrupar al instante
+    graph = SimilarityGraph(songs)
+    for group in graph.build_ratio(cleaned, floor_threshold, threshold, job.stats, progress, processes):
+        yield [songs[k] for k in group]
+    job.result = graph
 
-def analyze_excluding_artist(self):
-    self.current_mode = "not_artist"
-    if not self.folder:
-        CTkMessagebox(title="Error", message=t("folder_error", self.lang, self.translations), icon="warning")
+def iter_words_analysis(job, folder, cache, min_overlap, blacklist, errors=None, keep_graph=True, workers=DEFAULT_WORKERS, session=None, processes=1):
+    session = load_session(job, folder, cache, errors, workers, session)
+    job.progress("clean", 0, len(session.songs))
+    with session.lock:
+        songs = session.songs
+        cleaned = session.cleaned(blacklist)
+        token_sets = session.token_sets(blacklist)
+    progress = lambda done, total: job.progress("compare", done, total)
+    floor_overlap = word_floor_for(min_overlap) if keep_graph else None
+    if floor_overlap is None:
+        for group in sharded_word_groups(cleaned, min_overlap, job.stats, progress, token_sets, processes):
+            yield [songs[k] for k in group]
         return
-    songs = get_mp3_titles(self.folder)
-    songs = [s for s in songs if self.excluded_artist.get().strip().lower() not in (s[2] or '').lower()]
-    self.groups = group_songs_by_title(songs)
-    # Formatear mostrando artista
-    self.show_groups_in_tree(self.groups, formatter=lambda group: ",  ".join([f"{t} ({a})" for t, _, a in group]))
\ No newline at end of file
+    graph = SimilarityGraph(songs)
+    for group in graph.build_words(cleaned, floor_overlap, min_overlap, job.stats, progress, token_sets, processes):
+        yield [songs[k] for k in group]
+    job.result = graph
+
+def iter_not_artist_analysis(job, folder, cache, excluded, errors=None, workers=DEFAULT_WORKERS, session=None):
+    session = load_session(job, folder, cache, errors, workers, session)
+    songs = session.songs_excluding_artist(excluded)
+    job.progress("compare", len(songs), len(songs))
+    yield from group_songs_by_title(songs)
+
+def iter_content_analysis(job, folder, cache, errors=None, workers=DEFAULT_WORKERS, session=None):
+    songs = load_session(job, folder, cache, errors, workers, session).songs
+    progress = lambda done, total: job.progress("compare", done, total)
+    paths = [path for _, path, _ in songs]
+    for group in iter_content_groups(paths, workers, errors, job.stats, progress):
+        yield [songs[k] for k in group]
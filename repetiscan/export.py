@@ -0,0 +1,171 @@
+import csv
+import difflib
+import gzip
+import json
+import os
+import queue
+import threading
+
+from repetiscan.blacklist import DEFAULT_BLACKLIST, BlacklistNormalizer
+
+# Exportación de grupos en CSV (una fila por canción) o JSONL (una línea por grupo),
+# opcionalmente comprimida con gzip. Se escribe grupo a grupo, sin juntar el resultado.
+FORMATS = ("csv", "jsonl")
+CSV_HEADER = ["group", "title", "path", "artist", "size", "score"]
+
+
+def format_for(path, default="csv"):
+    # Formato y compresión según la extensión: grupos.csv, grupos.jsonl.gz...
+    name = path.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    fmt = "jsonl" if name.endswith((".jsonl", ".json")) else "csv" if name.endswith(".csv") else default
+    return fmt, compressed
+
+
+class Scorer:
+    """Puntuación de cada canción frente a la primera de su grupo, con la que se agrupó.
+
+    ratio: similitud de los títulos limpios (0.0 - 1.0); words: palabras en común;
+    content y not_artist: 1.0 (mismo audio / mismo título). La primera canción no
+    tiene puntuación (None).
+    """
+
+    def __init__(self, mode, blacklist=None):
+        self.mode = mode
+        self.clean = BlacklistNormalizer(DEFAULT_BLACKLIST if blacklist is None else blacklist).clean
+
+    def scores(self, group):
+        if not group:
+            return []
+        if self.mode == "ratio":
+            leader = self.clean(group[0][0])
+            rest = [round(difflib.SequenceMatcher(None, leader, self.clean(title)).ratio(), 4) for title, _, _ in group[1:]]
+        elif self.mode == "words":
+            leader = set(self.clean(group[0][0]).split())
+            rest = [len(leader & set(self.clean(title).split())) for title, _, _ in group[1:]]
+        else:
+            rest = [1.0] * (len(group) - 1)
+        return [None] + rest
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+class GroupExporter:
+    """Escribe grupos de (title, path, artist) a medida que llegan.
+
+    output puede ser una ruta o un flujo de texto abierto (no se cierra). Con una ruta,
+    fmt y compress se deducen de la extensión si no se indican.
+    """
+
+    def __init__(self, output, fmt=None, mode="ratio", blacklist=None, compress=None, sizes=True):
+        if isinstance(output, str):
+            guessed, gz = format_for(output)
+            fmt = fmt or guessed
+            compress = gz if compress is None else compress
+            opener = gzip.open if compress else open
+            self.stream = opener(output, "wt", newline="", encoding="utf-8")
+            self._owned = True
+        else:
+            if compress:
+                raise ValueError("compress necesita una ruta")
+            self.stream = output
+            self._owned = False
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato desconocido: {fmt}")
+        self.fmt = fmt
+        self.scorer = Scorer(mode, blacklist)
+        self.sizes = sizes
+        self.count = 0
+        self.rows = 0
+        if fmt == "csv":
+            self.writer = csv.writer(self.stream)
+            self.writer.writerow(CSV_HEADER)
+
+    def write(self, group):
+        self.count += 1
+        scores = self.scorer.scores(group)
+        if self.fmt == "csv":
+            for (title, path, artist), score in zip(group, scores):
+                size = _size(path) if self.sizes else None
+                self.writer.writerow([self.count, title, path, artist, "" if size is None else size, "" if score is None else score])
+        else:
+            songs = [{"title": title, "path": path, "artist": artist, "size": _size(path) if self.sizes else None, "score": score}
+                     for (title, path, artist), score in zip(group, scores)]
+            self.stream.write(json.dumps({"group": self.count, "songs": songs}, ensure_ascii=False) + "\n")
+        self.rows += len(group)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        if self._owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ExportJob:
+    """Exporta en un hilo aparte.
+
+    groups puede ser una lista o un generador. La interfaz lee job.count (grupos
+    escritos, de job.total si es una lista) y espera en job.events ("done", ruta), ("cancelled", ruta) o
+    ("error", excepción); al cancelar o con un error se borra el archivo a medias.
+    """
+
+    def __init__(self, groups, path, mode="ratio", blacklist=None):
+        self.groups = groups
+        self.path = path
+        self.mode = mode
+        self.blacklist = blacklist
+        self.events = queue.Queue()
+        self.count = 0
+        self.total = len(groups) if isinstance(groups, list) else None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self):
+        exporter = None
+        try:
+            with GroupExporter(self.path, mode=self.mode, blacklist=self.blacklist) as exporter:
+                for group in self.groups:
+                    if self._cancel.is_set():
+                        break
+                    exporter.write(group)
+                    self.count = exporter.count
+            if self._cancel.is_set():
+                self._remove()
+                self.events.put(("cancelled", self.path))
+            else:
+                self.events.put(("done", self.path))
+        except Exception as e:
+            # Sólo si se llegó a abrir: si no, el archivo que hubiera no es nuestro
+            if exporter is not None:
+                self._remove()
+            self.events.put(("error", e))
+
+    def _remove(self):
+        # Un archivo a medias no sirve para limpiar a partir de él
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,133 @@
+from array import array
+
+from repetiscan.parallel import iter_parallel_edges, use_parallel
+from repetiscan.similarity import iter_ratio_edges, iter_word_edges
+
+# El grafo guarda aristas algo por debajo del umbral buscado: cualquier umbral
+# mayor o igual que el mínimo se resuelve filtrando aristas, sin volver a comparar.
+# Bajar más el mínimo multiplica las aristas y el tiempo de la primera búsqueda.
+RATIO_MARGIN = 0.1
+WORD_FLOOR = 2
+
+
+def ratio_floor_for(threshold):
+    # None: no compensa construir grafo (todos los pares serían aristas)
+    floor_threshold = round(threshold - RATIO_MARGIN, 6)
+    return floor_threshold if floor_threshold > 0 else None
+
+
+def word_floor_for(min_overlap):
+    return min(min_overlap, WORD_FLOOR) if min_overlap >= 1 else None
+
+
+class SimilarityGraph:
+    """Grafo disperso de similitud entre canciones (aristas i < j en formato CSR).
+
+    Los grupos se rehacen con el mismo algoritmo voraz que las búsquedas, recorriendo
+    sólo las aristas que superan el umbral, así que el resultado es idéntico al de
+    iter_ratio_groups / iter_word_groups con ese umbral.
+    """
+
+    def __init__(self, songs):
+        self.songs = songs
+        self.ratio_floor = None
+        self.word_floor = None
+        self._ratio = None
+        self._words = None
+        self._removed = bytearray(len(songs))
+        self._index_of = None
+
+    def build_ratio(self, cleaned, floor_threshold, threshold=None, stats=None, progress=None, processes=1):
+        # Generador: construye las aristas y, si se pasa threshold, va entregando los
+        # grupos de ese umbral a medida que se completan las filas
+        if use_parallel(len(cleaned), processes):
+            edges = iter_parallel_edges("ratio", cleaned, floor_threshold, processes, stats, progress)
+        else:
+            edges = iter_ratio_edges(cleaned, floor_threshold, stats, progress)
+        csr = yield from _build(len(cleaned), edges, array('d'), threshold)
+        self._ratio = csr
+        self.ratio_floor = floor_threshold
+
+    def build_words(self, cleaned, floor_overlap, min_overlap=None, stats=None, progress=None, token_sets=None, processes=1):
+        if use_parallel(len(cleaned), processes):
+            edges = iter_parallel_edges("words", cleaned, floor_overlap, processes, stats, progress)
+        else:
+            edges = iter_word_edges(cleaned, floor_overlap, stats, progress=progress, token_sets=token_sets)
+        csr = yield from _build(len(cleaned), edges, array('L'), min_overlap)
+        self._words = csr
+        self.word_floor = floor_overlap
+
+    def groups_by_ratio(self, threshold):
+        # None si el grafo no sirve para este umbral (hay que volver a buscar)
+        if self._ratio is None or threshold < self.ratio_floor:
+            return None
+        return self._resolve(_replay(self._removed, *self._ratio, threshold))
+
+    def groups_by_words(self, min_overlap):
+        if self._words is None or min_overlap < self.word_floor:
+            return None
+        return self._resolve(_replay(self._removed, *self._words, min_overlap))
+
+    def discard(self, paths):
+        # Canciones borradas: dejan de aparecer al reagrupar
+        if self._index_of is None:
+            self._index_of = {path: k for k, (_, path, _) in enumerate(self.songs)}
+        for path in paths:
+            k = self._index_of.get(path)
+            if k is not None:
+                self._removed[k] = 1
+
+    def edge_count(self):
+        return sum(len(csr[1]) for csr in (self._ratio, self._words) if csr is not None)
+
+    def _resolve(self, groups):
+        return [[self.songs[k] for k in group] for group in groups]
+
+
+def _build(n, edges, weights, threshold):
+    offsets = array('L', [0]) * (n + 1)
+    targets = array('L')
+    seen = bytearray(n)
+    row = 0
+    for i, j, weight in edges:
+        # Las aristas llegan ordenadas por fila: al pasar a la fila i, las anteriores están completas
+        while row < i:
+            row += 1
+            offsets[row] = len(targets)
+            if threshold is not None:
+                group = _replay_row(row - 1, offsets, targets, weights, threshold, seen)
+                if group:
+                    yield group
+        targets.append(j)
+        weights.append(weight)
+    while row < n:
+        row += 1
+        offsets[row] = len(targets)
+        if threshold is not None:
+            group = _replay_row(row - 1, offsets, targets, weights, threshold, seen)
+            if group:
+                yield group
+    return offsets, targets, weights
+
+
+def _replay_row(i, offsets, targets, weights, threshold, seen):
+    if seen[i]:
+        return None
+    seen[i] = 1
+    group = [i]
+    for e in range(offsets[i], offsets[i + 1]):
+        j = targets[e]
+        if weights[e] >= threshold and not seen[j]:
+            seen[j] = 1
+            group.append(j)
+    return group if len(group) > 1 else None
+
+
+def _replay(removed, offsets, targets, weights, threshold):
+    seen = bytearray(removed)
+    groups = []
+    for i in range(len(seen)):
+        group = _replay_row(i, offsets, targets, weights, threshold, seen)
+        if group:
+            groups.append(group)
+    return groups
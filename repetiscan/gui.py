@@ -1,16 +1,76 @@
 import os
+import queue
+import time
 import tkinter as tk
 import customtkinter
 from CTkMessagebox import CTkMessagebox
 from tkinter import filedialog, ttk
-from send2trash import send2trash
-from pathlib import Path
 from repetiscan.language import t, load_translations
-from repetiscan.blacklist import refresh_checkboxes, add_word, save_and_close, load_blacklist
+from repetiscan.blacklist import load_blacklist
+from repetiscan.blacklist_editor import refresh_checkboxes, add_word, save_and_close
 from repetiscan.utils import play, export_csv
+from repetiscan.cache import TagCache
+from repetiscan.jobs import AnalysisJob
+from repetiscan.parallel import DEFAULT_PROCESSES
+from repetiscan.profiling import TRACE_FILE, PROFILE_FILE
+from repetiscan.watch import FolderWatcher
+from repetiscan.trash import TrashJob, select_paths, restore_batch
+from repetiscan.export import ExportJob
 from repetiscan.core import *
 
-BLACKLIST_FILE = "blacklist.json"
+POLL_MS = 100
+REGROUP_MS = 80
+WATCH_POLL_MS = 500
+# Fallos de la papelera que se muestran en el aviso
+MAX_FAILURES_SHOWN = 10
+# Filas por página de la tabla y tarjetas que se crean de cada vez en la ventana de detalle
+PAGE_SIZE = 500
+DETAIL_CHUNK = 24
+
+def analyze_by_ratio(self):
+    self.current_mode = "ratio"
+    if not self.folder:
+        CTkMessagebox(title="Error", message=t("folder_error", self.lang, self.translations), icon="warning")
+        return
+    folder, errors, session = self.folder, [], self.session
+    self.scan_errors = errors
+    threshold, blacklist = self.threshold.get(), dict(self.blacklist)
+    self.start_analysis(lambda job: iter_ratio_analysis(job, folder, self.tag_cache, threshold, blacklist, errors,
+                                                        session=session, processes=DEFAULT_PROCESSES))
+
+def analyze_by_words(self):
+    self.current_mode = "words"
+    if not self.folder:
+        CTkMessagebox(title="Error", message=t("folder_error", self.lang, self.translations), icon="warning")
+        return
+    folder, errors, session = self.folder, [], self.session
+    self.scan_errors = errors
+    min_overlap, blacklist = self.min_overlap.get(), dict(self.blacklist)
+    self.start_analysis(lambda job: iter_words_analysis(job, folder, self.tag_cache, min_overlap, blacklist, errors,
+                                                        session=session, processes=DEFAULT_PROCESSES))
+
+def analyze_excluding_artist(self):
+    self.current_mode = "not_artist"
+    if not self.folder:
+        CTkMessagebox(title="Error", message=t("folder_error", self.lang, self.translations), icon="warning")
+        return
+    folder, errors, session = self.folder, [], self.session
+    self.scan_errors = errors
+    excluded = self.excluded_artist.get().strip().lower()
+    # Formatear mostrando artista
+    self.start_analysis(lambda job: iter_not_artist_analysis(job, folder, self.tag_cache, excluded, errors, session=session),
+                        formatter=lambda group: ",  ".join([f"{t} ({a})" for t, _, a in group]))
+
+def analyze_by_content(self):
+    self.current_mode = "content"
+    if not self.folder:
+        CTkMessagebox(title="Error", message=t("folder_error", self.lang, self.translations), icon="warning")
+        return
+    folder, errors, session = self.folder, [], self.session
+    self.scan_errors = errors
+    # Los títulos pueden ser distintos: se muestra también el nombre del archivo
+    self.start_analysis(lambda job: iter_content_analysis(job, folder, self.tag_cache, errors, session=session),
+                        formatter=lambda group: ",  ".join([f"{t} ({os.path.basename(p)})" for t, p, _ in group]))
 
 class SimilarityApp:
     def __init__(self, root):
@@ -25,6 +85,24 @@ class SimilarityApp:
         self.groups = []
         self.current_mode = "ratio"
         self.blacklist = load_blacklist()
+        self.tag_cache = TagCache()
+        self.scan_errors = []
+        self.job = None
+        self.group_formatter = None
+        self.graph = None
+        # Canciones ya escaneadas de la carpeta actual, compartidas por todos los modos
+        self.session = None
+        # Opciones de diagnóstico (barra lateral)
+        self.save_trace = customtkinter.BooleanVar(value=False)
+        self.use_cprofile = customtkinter.BooleanVar(value=False)
+        self.watcher = None
+        self.trash_job = None
+        self.export_job = None
+        self.tree_rows = {}
+        self.page = 0
+        self._regroup_after = None
+        self.threshold.trace_add("write", self.schedule_regroup)
+        self.min_overlap.trace_add("write", self.schedule_regroup)
         self.lang = "es"
         self.translations = load_translations()
         self.language_names = self.translations.get("LANGUAGES", {})
@@ -65,16 +143,20 @@ class SimilarityApp:
         
         # Fila 1: Seleccionar carpeta
         customtkinter.CTkButton(control_frame, text=t("select_folder", self.lang, self.translations), command=self.select_folder, width=30).grid(row=0, column=0, padx=5, pady=5)
+        customtkinter.CTkButton(control_frame, text=t("rescan", self.lang, self.translations), command=self.rescan, width=30).grid(row=0, column=1, padx=5, pady=5)
+        customtkinter.CTkButton(control_frame, text=t("search_content", self.lang, self.translations), command=lambda: analyze_by_content(self), width=30).grid(row=0, column=2, padx=5, pady=5)
 
         # Fila 2: Buscar por porcentaje
         customtkinter.CTkLabel(control_frame, text=t("similarity_label", self.lang, self.translations)).grid(row=1, column=0, sticky="w", padx=5)
         customtkinter.CTkEntry(control_frame, textvariable=self.threshold, width=40).grid(row=1, column=1, padx=5)
         customtkinter.CTkButton(control_frame, text=t("search_ratio", self.lang, self.translations), command=lambda: analyze_by_ratio(self), width=30).grid(row=1, column=2, padx=5, pady=5)
+        customtkinter.CTkSlider(control_frame, variable=self.threshold, from_=0, to=1, number_of_steps=100, width=140).grid(row=1, column=3, padx=5)
 
         # Fila 3: Buscar por palabras
         customtkinter.CTkLabel(control_frame, text=t("min_common_words", self.lang, self.translations)).grid(row=2, column=0, sticky="w", padx=5)
         customtkinter.CTkEntry(control_frame, textvariable=self.min_overlap, width=40).grid(row=2, column=1, padx=5)
         customtkinter.CTkButton(control_frame, text=t("search_words", self.lang, self.translations), command=lambda: analyze_by_words(self), width=30).grid(row=2, column=2, padx=5, pady=5)
+        customtkinter.CTkSlider(control_frame, variable=self.min_overlap, from_=1, to=10, number_of_steps=9, width=140).grid(row=2, column=3, padx=5)
 
         # Fila 4: Buscar no artista
         customtkinter.CTkLabel(control_frame, text=t("exclude_artist", self.lang, self.translations)).grid(row=3, column=0, sticky="w", padx=5)
@@ -90,6 +172,26 @@ class SimilarityApp:
         # Fila 7: Ayuda
         customtkinter.CTkButton(control_frame, text=t("help", self.lang, self.translations), command=self.show_help, width=30).grid(row=4, column=2, padx=5, pady=5)
 
+        # Vigilar la carpeta
+        self.watch_btn = customtkinter.CTkButton(control_frame, text=t("watch_stop" if self.watcher else "watch_start", self.lang, self.translations), command=self.toggle_watch, width=30)
+        self.watch_btn.grid(row=4, column=3, padx=5, pady=5)
+
+
+        # Barra de estado
+        status_frame = customtkinter.CTkFrame(self.root)
+        status_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        self.status_label = customtkinter.CTkLabel(status_frame, text="", anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True, padx=10)
+        self.cancel_btn = customtkinter.CTkButton(status_frame, text=t("cancel", self.lang, self.translations), command=self.cancel_analysis, width=30, state="normal" if self.job else "disabled")
+        self.cancel_btn.pack(side="right", padx=5, pady=5)
+
+        # Paginación
+        page_frame = customtkinter.CTkFrame(self.root, fg_color="transparent")
+        page_frame.pack(side="bottom", pady=(0, 5))
+        customtkinter.CTkButton(page_frame, text="◀", width=30, command=lambda: self.go_to_page(self.page - 1)).pack(side="left", padx=5)
+        self.page_label = customtkinter.CTkLabel(page_frame, text="")
+        self.page_label.pack(side="left", padx=10)
+        customtkinter.CTkButton(page_frame, text="▶", width=30, command=lambda: self.go_to_page(self.page + 1)).pack(side="left", padx=5)
 
         # Tabla
         self.tree = ttk.Treeview(self.root, columns=("Grupo",), show="headings", selectmode="extended")
@@ -98,6 +200,7 @@ class SimilarityApp:
         self.tree.bind("<Double-1>", self.on_double_click)
         self.tree.bind("<Button-3>", self.on_right_click)
         self.tree.pack(padx=10, pady=10, fill='both', expand=True)
+        self.render_page()
 
     def refresh_ui(self):
         for widget in self.root.winfo_children():
@@ -127,7 +230,18 @@ class SimilarityApp:
             )
             lang_option.set(self.language_names[self.lang])
             lang_option.pack(pady=10, padx=16)  # <-- margen exterior horizontal
-            
+
+            # Caché de etiquetas
+            cache_btn = customtkinter.CTkButton(self.sidebar_frame, text=t("rebuild_cache", self.lang, self.translations), command=self.rebuild_cache)
+            cache_btn.pack(pady=(20, 10), padx=16)
+
+            # Deshacer el último lote enviado a la papelera
+            customtkinter.CTkButton(self.sidebar_frame, text=t("restore_trash", self.lang, self.translations), command=self.restore_last_trash).pack(pady=10, padx=16)
+
+            # Diagnóstico: traza JSON y cProfile del próximo análisis
+            customtkinter.CTkCheckBox(self.sidebar_frame, text=t("save_trace", self.lang, self.translations), variable=self.save_trace).pack(pady=(20, 5), padx=16, anchor="w")
+            customtkinter.CTkCheckBox(self.sidebar_frame, text=t("use_cprofile", self.lang, self.translations), variable=self.use_cprofile).pack(pady=5, padx=16, anchor="w")
+
             self.sidebar_visible = True
 
     def set_language_full(self, lang_name):
@@ -138,18 +252,218 @@ class SimilarityApp:
         self.refresh_ui()
         self.toggle_sidebar()
 
-    # Show groups in treeview
-    def show_groups_in_tree(self, groups, formatter=None):
+    def rebuild_cache(self):
+        stats = self.tag_cache.stats()
+        self.tag_cache.rebuild()
+        CTkMessagebox(title=t("rebuild_cache", self.lang, self.translations), message=t("cache_rebuilt_text", self.lang, self.translations).format(**stats))
+
+    # Sólo se crean las filas de la página visible
+    def page_count(self):
+        return max(1, -(-len(self.groups) // PAGE_SIZE))
+
+    def render_page(self):
+        self.page = min(max(self.page, 0), self.page_count() - 1)
+        self.clear_tree()
+        start = self.page * PAGE_SIZE
+        self.insert_group_rows(self.groups[start:start + PAGE_SIZE])
+        self.update_page_label()
+
+    def go_to_page(self, page):
+        if 0 <= page < self.page_count() and page != self.page:
+            self.page = page
+            self.render_page()
+
+    def update_page_label(self):
+        self.page_label.configure(text=t("page", self.lang, self.translations).format(page=self.page + 1, pages=self.page_count(), groups=len(self.groups)))
+
+    def append_groups(self, groups):
+        start = len(self.groups)
+        self.groups.extend(groups)
+        page_start = self.page * PAGE_SIZE
+        page_end = page_start + PAGE_SIZE
+        if start < page_end:
+            self.insert_group_rows(groups[max(0, page_start - start):page_end - start])
+        self.update_page_label()
+
+    def format_group(self, group):
+        if self.group_formatter:
+            return self.group_formatter(group)
+        return ",  ".join([t for t, _, _ in group])
+
+    # Cada fila usa id(grupo) como iid: sigue siendo válida aunque se quiten o dividan otras filas
+    def insert_group_rows(self, groups, index='end'):
+        for offset, group in enumerate(groups):
+            iid = str(id(group))
+            self.tree_rows[iid] = group
+            self.tree.insert('', index if index == 'end' else index + offset, iid=iid, values=(self.format_group(group),))
+
+    def clear_tree(self):
         self.tree.delete(*self.tree.get_children())
-        if not groups:
+        self.tree_rows.clear()
+
+    def groups_for_rows(self, iids):
+        return [self.tree_rows[iid] for iid in iids if iid in self.tree_rows]
+
+    # Actualización incremental tras mover archivos a la papelera
+    def remove_from_results(self, paths):
+        paths = set(paths)
+        if not paths:
+            return
+        if self.session is not None:
+            self.session.discard(paths)
+        self.prune_results(paths)
+
+    # Quita esas rutas de los grupos, la tabla y el grafo sin tocar la sesión
+    # (el modo vigilancia ya la ha actualizado)
+    def prune_results(self, paths):
+        paths = set(paths)
+        if not paths:
+            return
+        if self.graph is not None:
+            self.graph.discard(paths)
+        try:
+            threshold, min_overlap = self.threshold.get(), self.min_overlap.get()
+        except (tk.TclError, ValueError):
+            threshold, min_overlap = 0.8, 2
+        affected = [group for group in self.groups if any(path in paths for _, path, _ in group)]
+        for group in affected:
+            remaining = [song for song in group if song[1] not in paths]
+            # Sólo se vuelve a agrupar lo que quedaba del grupo afectado
+            self.replace_group(group, regroup_songs(remaining, self.current_mode, threshold, min_overlap, self.blacklist))
+
+    def replace_group(self, old, new_groups):
+        iid = str(id(old))
+        pos = next(k for k, group in enumerate(self.groups) if group is old)
+        self.groups[pos:pos + 1] = new_groups
+        if iid in self.tree_rows and len(new_groups) == 1:
+            row = self.tree.index(iid)
+            self.tree.delete(iid)
+            del self.tree_rows[iid]
+            self.insert_group_rows(new_groups, row)
+        elif pos < (self.page + 1) * PAGE_SIZE:
+            # Cambia el número de grupos: se desplazan las filas de esta página
+            self.render_page()
+        self.update_page_label()
+
+    # Análisis en segundo plano
+    def start_analysis(self, work, formatter=None):
+        if self.job is not None:
+            self.job.cancel()
+        self.groups = []
+        self.graph = None
+        self.group_formatter = formatter
+        self.page = 0
+        self.render_page()
+        self.job = AnalysisJob(work, cprofile=self.use_cprofile.get()).start()
+        self.cancel_btn.configure(state="normal")
+        self.root.after(POLL_MS, self.poll_job, self.job)
+
+    def cancel_analysis(self):
+        if self.job is not None:
+            self.job.cancel()
+        if self.trash_job is not None:
+            self.trash_job.cancel()
+        if self.export_job is not None:
+            self.export_job.cancel()
+
+    def poll_job(self, job):
+        if job is not self.job:
+            return
+        finished = None
+        # Pocos lotes por vuelta para que la ventana siga respondiendo
+        for _ in range(5):
+            try:
+                kind, payload = job.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "groups":
+                self.append_groups(payload)
+            else:
+                finished = (kind, payload)
+                break
+        self.update_status(job, finished[0] if finished else None)
+        if finished is None:
+            self.root.after(POLL_MS, self.poll_job, job)
+            return
+        self.job = None
+        if self.trash_job is None and self.export_job is None:
+            self.cancel_btn.configure(state="disabled")
+        kind, payload = finished
+        if job.session is not None:
+            self.session = job.session
+        if kind == "done":
+            self.graph = job.result
+            if self.watcher is not None:
+                self.watcher.configure(self.session, self.watch_settings())
+        self.save_diagnostics(job)
+        if kind == "done" and not self.groups:
             CTkMessagebox(title=t("no_coincidence", self.lang, self.translations), message=t("no_coincidence_text", self.lang, self.translations))
+        elif kind == "error":
+            CTkMessagebox(title="Error", message=str(payload), icon="cancel")
+
+    def save_diagnostics(self, job):
+        try:
+            if self.save_trace.get():
+                job.profile.write_trace(TRACE_FILE)
+            if self.use_cprofile.get():
+                job.profile.dump_cprofile(PROFILE_FILE)
+        except OSError as e:
+            CTkMessagebox(title="Error", message=str(e), icon="cancel")
+
+    def update_status(self, job, finished=None):
+        if finished == "done":
+            text = t("status_done", self.lang, self.translations).format(groups=len(self.groups), files=job.files, seconds=job.elapsed())
+            timings = job.profile.timings
+            text += t("status_profile", self.lang, self.translations).format(
+                scan=timings.get("scan", 0), clean=timings.get("clean", 0), compare=timings.get("compare", 0),
+                pairs=job.stats.get("pairs_compared", 0),
+                # Con el grafo se buscan todas las aristas: se cuenta sobre todos los pares
+                pruned=job.stats.get("pairs_pruned", job.stats.get("edge_pairs_pruned", 0))
+            )
+        elif finished == "cancelled":
+            text = t("status_cancelled", self.lang, self.translations)
+        elif finished == "error":
+            text = t("status_error", self.lang, self.translations)
+        elif job.stage == "scan":
+            text = t("status_scanning", self.lang, self.translations).format(files=job.files)
+        else:
+            eta = job.eta()
+            text = t("status_comparing", self.lang, self.translations).format(
+                done=job.done, total=job.total, pairs=job.stats.get("pairs_compared", 0),
+                groups=len(self.groups), eta=f"{eta:.0f} s" if eta is not None else "--"
+            )
+        if self.scan_errors:
+            text += t("status_errors", self.lang, self.translations).format(errors=len(self.scan_errors))
+        self.status_label.configure(text=text)
+
+    # Reagrupar desde el grafo al cambiar el umbral, sin volver a analizar
+    def schedule_regroup(self, *_):
+        if self._regroup_after is not None:
+            self.root.after_cancel(self._regroup_after)
+        self._regroup_after = self.root.after(REGROUP_MS, self.regroup_from_graph)
+
+    def regroup_from_graph(self):
+        self._regroup_after = None
+        if self.graph is None or self.job is not None:
             return
-        for idx, group in enumerate(groups):
-            if formatter:
-                names = formatter(group)
+        start = time.perf_counter()
+        try:
+            if self.current_mode == "ratio":
+                groups = self.graph.groups_by_ratio(self.threshold.get())
+                floor_value = self.graph.ratio_floor
+            elif self.current_mode == "words":
+                groups = self.graph.groups_by_words(self.min_overlap.get())
+                floor_value = self.graph.word_floor
             else:
-                names = ",  ".join([t for t, _, _ in group])
-            self.tree.insert('', 'end', iid=idx, values=(names,))
+                return
+        except (tk.TclError, ValueError):
+            return  # valor a medio escribir
+        if groups is None:
+            self.status_label.configure(text=t("status_below_floor", self.lang, self.translations).format(floor=floor_value))
+            return
+        self.groups = groups
+        self.render_page()
+        self.status_label.configure(text=t("status_regrouped", self.lang, self.translations).format(groups=len(groups), ms=(time.perf_counter() - start) * 1000))
 
     # Open blacklist editor
     def open_blacklist_editor(self):
@@ -186,29 +500,194 @@ class SimilarityApp:
 
     def on_right_click(self, event):
         selected = self.tree.selection()
-        if self.current_mode != "not_artist" or not selected:
+        if not selected:
             return
 
-        menu = customtkinter.CTkMenu(self.root, tearoff=0)
-        menu.add_command(label="🗑️ Eliminar grupo(s)", command=lambda: self.delete_selected_groups(selected))
+        menu = tk.Menu(self.root, tearoff=0)
+        menu.add_command(label=t("group_delete", self.lang, self.translations), command=lambda: self.delete_selected_groups(selected))
+        menu.add_command(label=t("group_keep_one", self.lang, self.translations), command=lambda: self.delete_selected_groups(selected, keep_one=True))
         menu.tk_popup(event.x_root, event.y_root)
 
-    def delete_selected_groups(self, selected):
-        confirm = CTkMessagebox(title=t("confirm_delete", self.lang, self.translations), message=t("confirm_delete_text", self.lang, self.translations), option_1="Yes", option_2="No", icon="warning")
-        if not confirm == "Yes":
+    def delete_selected_groups(self, selected, keep_one=False):
+        self.trash_paths(select_paths(self.groups_for_rows(selected), keep_one))
+
+    # Papelera por lotes: una sola confirmación, los archivos se mueven en otro hilo
+    def trash_paths(self, paths, on_start=None):
+        if not paths:
+            return
+        if self.trash_job is not None:
+            CTkMessagebox(title=t("move_to_trash", self.lang, self.translations), message=t("trash_busy", self.lang, self.translations), icon="info")
+            return
+        if len(paths) == 1:
+            message = t("move_to_trash_text", self.lang, self.translations).format(filepath=paths[0])
+        else:
+            message = t("confirm_delete_text", self.lang, self.translations).format(count=len(paths))
+        confirm = CTkMessagebox(title=t("confirm_delete", self.lang, self.translations), message=message, option_1="Yes", option_2="No", icon="warning")
+        if confirm.get() != "Yes":
             return
-        indices = [int(i) for i in selected]
-        for idx in sorted(indices, reverse=True):
-            for _, path, _ in self.groups[idx]:
+        if on_start:
+            on_start()
+        self.trash_job = TrashJob(paths).start()
+        self.cancel_btn.configure(state="normal")
+        self.root.after(POLL_MS, self.poll_trash, self.trash_job)
+
+    def poll_trash(self, job):
+        if job is not self.trash_job:
+            return
+        try:
+            kind, payload = job.events.get_nowait()
+        except queue.Empty:
+            self.status_label.configure(text=t("status_trashing", self.lang, self.translations).format(done=job.done, total=job.total))
+            self.root.after(POLL_MS, self.poll_trash, job)
+            return
+        self.trash_job = None
+        if self.job is None and self.export_job is None:
+            self.cancel_btn.configure(state="disabled")
+        # También tras un error: lo que se movió ya no está en la carpeta
+        self.remove_from_results(job.trashed)
+        self.status_label.configure(text=t("status_trashed", self.lang, self.translations).format(
+            trashed=len(job.trashed), failed=len(job.failures), skipped=job.total - job.done
+        ))
+        if kind == "error":
+            CTkMessagebox(title="Error", message=str(payload), icon="cancel")
+        if job.failures:
+            self.show_failures(t("trash_failed", self.lang, self.translations), job.failures)
+
+    def show_failures(self, title, failures):
+        lines = [f"{os.path.basename(path)}: {error}" for path, error in failures[:MAX_FAILURES_SHOWN]]
+        if len(failures) > MAX_FAILURES_SHOWN:
+            lines.append(t("more_failures", self.lang, self.translations).format(count=len(failures) - MAX_FAILURES_SHOWN))
+        CTkMessagebox(title=title, message="\n".join(lines), icon="warning")
+
+    # Exportación en segundo plano de los grupos actuales (utils.export_csv pide la ruta)
+    def start_export(self, path):
+        if self.export_job is not None:
+            CTkMessagebox(title=t("export_csv", self.lang, self.translations), message=t("export_busy", self.lang, self.translations), icon="info")
+            return
+        self.export_job = ExportJob(list(self.groups), path, self.current_mode, dict(self.blacklist)).start()
+        self.cancel_btn.configure(state="normal")
+        self.root.after(POLL_MS, self.poll_export, self.export_job)
+
+    def poll_export(self, job):
+        if job is not self.export_job:
+            return
+        try:
+            kind, payload = job.events.get_nowait()
+        except queue.Empty:
+            self.status_label.configure(text=t("status_exporting", self.lang, self.translations).format(done=job.count, total=job.total))
+            self.root.after(POLL_MS, self.poll_export, job)
+            return
+        self.export_job = None
+        if self.job is None and self.trash_job is None:
+            self.cancel_btn.configure(state="disabled")
+        if kind == "done":
+            self.status_label.configure(text=t("status_exported", self.lang, self.translations).format(groups=job.count))
+            CTkMessagebox(title=t("exported", self.lang, self.translations), message=t("exported_text", self.lang, self.translations).format(path=payload))
+        elif kind == "cancelled":
+            self.status_label.configure(text=t("status_export_cancelled", self.lang, self.translations))
+        else:
+            CTkMessagebox(title="Error", message=t("export_patch_error", self.lang, self.translations).format(e=payload), icon="warning")
+
+    def restore_last_trash(self):
+        try:
+            _, restored, failures = restore_batch("last")
+        except KeyError:
+            CTkMessagebox(title=t("restore_trash", self.lang, self.translations), message=t("restore_nothing", self.lang, self.translations), icon="info")
+            return
+        except OSError as e:
+            CTkMessagebox(title="Error", message=str(e), icon="cancel")
+            return
+        if failures:
+            self.show_failures(t("restore_trash", self.lang, self.translations), failures)
+        CTkMessagebox(title=t("restore_trash", self.lang, self.translations), message=t("restore_done", self.lang, self.translations).format(restored=len(restored), failed=len(failures)))
+
+    # Modo vigilancia: los cambios de la carpeta se aplican sobre los grupos actuales
+    def watch_settings(self):
+        try:
+            threshold, min_overlap = self.threshold.get(), self.min_overlap.get()
+        except (tk.TclError, ValueError):
+            threshold, min_overlap = 0.8, 2
+        return {"mode": self.current_mode, "threshold": threshold, "min_overlap": min_overlap,
+                "blacklist": dict(self.blacklist), "excluded": self.excluded_artist.get().strip().lower()}
+
+    def toggle_watch(self):
+        if self.watcher is not None:
+            self.stop_watch()
+            return
+        if self.job is not None or self.session is None or self.session.folder != self.folder:
+            CTkMessagebox(title=t("watch_start", self.lang, self.translations), message=t("watch_needs_analysis", self.lang, self.translations), icon="info")
+            return
+        self.watcher = FolderWatcher(self.folder, self.session, self.watch_settings(), self.tag_cache).start()
+        self.watch_btn.configure(text=t("watch_stop", self.lang, self.translations))
+        self.root.after(WATCH_POLL_MS, self.poll_watch, self.watcher)
+
+    def stop_watch(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.watch_btn.configure(text=t("watch_start", self.lang, self.translations))
+
+    def poll_watch(self, watcher):
+        if watcher is not self.watcher:
+            return
+        # Durante un análisis los cambios esperan en la cola y se aplican a los grupos nuevos
+        if self.job is None:
+            watcher.configure(self.session or watcher.session, self.watch_settings())
+            for _ in range(5):
                 try:
-                    send2trash(str(Path(path)))
-                except:
-                    pass
-            self.tree.delete(idx)
-            self.groups.pop(idx)
+                    event = watcher.events.get_nowait()
+                except queue.Empty:
+                    break
+                if event[0] == "error":
+                    self.stop_watch()
+                    CTkMessagebox(title="Error", message=str(event[1]), icon="cancel")
+                    return
+                self.apply_watch_changes(*event[1:])
+        self.root.after(WATCH_POLL_MS, self.poll_watch, watcher)
+
+    def apply_watch_changes(self, removed, modified, placements, errors):
+        self.scan_errors.extend(errors)
+        # Los modificados siguen en la sesión y vuelven a colocarse con placements
+        self.prune_results(removed + modified)
+        grouped = 0
+        if placements:
+            # Las canciones nuevas no están en el grafo: otro umbral necesita un análisis nuevo
+            self.graph = None
+            group_of = {path: group for group in self.groups for _, path, _ in group}
+            for song, similar in placements:
+                if song[1] in group_of or not similar:
+                    continue
+                target = next((group_of[s[1]] for s in similar if s[1] in group_of), None)
+                if target is not None:
+                    # Se une al grupo de la primera canción parecida
+                    group = target + [song]
+                    self.replace_group(target, [group])
+                else:
+                    group = list(similar) + [song]
+                    self.append_groups([group])
+                for _, path, _ in group:
+                    group_of[path] = group
+                grouped += 1
+        backend = self.watcher.backend if self.watcher is not None else None
+        text = t("status_watch", self.lang, self.translations).format(
+            backend=backend or "...", added=len(placements), removed=len(removed), grouped=grouped
+        )
+        if self.scan_errors:
+            text += t("status_errors", self.lang, self.translations).format(errors=len(self.scan_errors))
+        self.status_label.configure(text=text)
+
+    def rescan(self):
+        # Olvida las canciones en memoria y repite el modo actual leyendo la carpeta de nuevo
+        self.session = None
+        self.graph = None
+        {"ratio": analyze_by_ratio, "words": analyze_by_words, "not_artist": analyze_excluding_artist,
+         "content": analyze_by_content}.get(self.current_mode, analyze_by_ratio)(self)
 
     def select_folder(self):
         self.folder = filedialog.askdirectory()
+        self.stop_watch()
+        self.graph = None
+        self.session = None
         if self.folder:
             CTkMessagebox(title=t("select_folder", self.lang, self.translations), message=self.folder)
 
@@ -218,8 +697,7 @@ class SimilarityApp:
         if not selected_items:
             return
 
-        selected_indices = [int(item) for item in selected_items]
-        selected_groups = [self.groups[idx] for idx in selected_indices]
+        selected_groups = self.groups_for_rows(selected_items)
 
         win = customtkinter.CTkToplevel(self.root)
         win.title(t("group_action", self.lang, self.translations))
@@ -229,7 +707,17 @@ class SimilarityApp:
         h_scroll = tk.Scrollbar(win, orient="horizontal")
         h_scroll.pack(side="bottom", fill="x")
 
-        canvas = customtkinter.CTkCanvas(win, xscrollcommand=h_scroll.set, bg="#444444", highlightthickness=0)
+        # Las tarjetas se crean por tandas al acercarse al final del scroll
+        songs = [song for group in selected_groups for song in group]
+        loaded = {"count": 0, "pending": False}
+
+        def on_xscroll(first, last):
+            h_scroll.set(first, last)
+            if float(last) > 0.9 and loaded["count"] < len(songs) and not loaded["pending"]:
+                loaded["pending"] = True
+                win.after_idle(add_cards)
+
+        canvas = customtkinter.CTkCanvas(win, xscrollcommand=on_xscroll, bg="#444444", highlightthickness=0)
         canvas.pack(side="top", fill="both", expand=True)
         h_scroll.config(command=canvas.xview)
 
@@ -237,69 +725,31 @@ class SimilarityApp:
         canvas.create_window((0, 0), window=content_frame, anchor="nw")
 
         def delete_all():
-            confirm = CTkMessagebox(title=t("delete_all", self.lang, self.translations), message=t("delete_all_text", self.lang, self.translations), option_1="Yes", option_2="No", icon="warning")
-            if confirm.get() == "Yes":
-                for group in selected_groups:
-                    for _, path, _ in group:
-                        try:
-                            send2trash(str(Path(path)))
-                        except:
-                            pass
-                win.destroy()
-                if self.current_mode == "not_artist":
-                    for idx in sorted(selected_indices, reverse=True):
-                        self.groups.pop(idx)
-                        self.tree.delete(idx)
-                else:
-                    analyze_by_ratio(self)
-
-        for group in selected_groups:
-            for title, path, artist in group:
+            self.trash_paths(select_paths(selected_groups), on_start=win.destroy)
+
+        def add_cards():
+            loaded["pending"] = False
+            if not win.winfo_exists():
+                return
+            start = loaded["count"]
+            end = min(len(songs), start + DETAIL_CHUNK)
+            for title, path, artist in songs[start:end]:
                 sub = customtkinter.CTkFrame(content_frame, fg_color="#222222")
                 sub.pack(side="left", padx=10, pady=5)
                 customtkinter.CTkLabel(sub, text=title, wraplength=150).pack(pady=2)
                 customtkinter.CTkLabel(sub, text=f"👤 {artist}", wraplength=150).pack(pady=2)
                 customtkinter.CTkButton(sub, text=t("reproduce", self.lang, self.translations), command=lambda p=path: play(p)).pack(pady=2, padx=5, fill="x")
                 customtkinter.CTkButton(sub, text=t("move_to_trash", self.lang, self.translations), command=lambda p=path: self.delete(p, win)).pack(pady=5, padx=5, fill="x")
+            loaded["count"] = end
+
+            if end == len(songs):
+                customtkinter.CTkButton(content_frame, text=t("delete_entire_group", self.lang, self.translations), command=delete_all, fg_color="red", text_color="white").pack(pady=10)
 
-        if self.current_mode == "not_artist":
-            customtkinter.CTkButton(content_frame, text=t("delete_entire_group", self.lang, self.translations), command=delete_all, fg_color="red", text_color="white").pack(pady=10)
+            content_frame.update_idletasks()
+            canvas.config(scrollregion=canvas.bbox("all"))
 
-        content_frame.update_idletasks()
-        canvas.config(scrollregion=canvas.bbox("all"))
+        add_cards()
 
 
     def delete(self, filepath, window=None):
-        confirm = CTkMessagebox(
-            title=t("move_to_trash", self.lang, self.translations),
-            message=t("move_to_trash_text", self.lang, self.translations).format(filepath=filepath),
-            option_1="Yes", option_2="No", icon="warning"
-        )
-        if confirm.get() == "Yes":
-            try:
-                if not os.path.exists(filepath):
-                    CTkMessagebox(
-                        title=t("file_not_found", self.lang, self.translations),
-                        message=t("file_not_found_text", self.lang, self.translations).format(filepath=filepath),
-                        icon="cancel"
-                    )
-                    return
-                send2trash(str(Path(filepath)))
-                CTkMessagebox(
-                    title=t("deleted", self.lang, self.translations),
-                    message=t("deleted_text", self.lang, self.translations).format(filepath=filepath)
-                )
-                if window:
-                    window.destroy()
-                if self.current_mode == "ratio":
-                    analyze_by_ratio(self)
-                elif self.current_mode == "words":
-                    analyze_by_words(self)
-                elif self.current_mode == "not_artist":
-                    analyze_excluding_artist(self)
-            except Exception as e:
-                CTkMessagebox(
-                    title="Error",
-                    message=t("trash_error", self.lang, self.translations).format(e=e),
-                    icon="cancel"
-                )
+        self.trash_paths([filepath], on_start=window.destroy if window else None)
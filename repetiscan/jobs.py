@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+
+from repetiscan.profiling import Profile
+
+# Los grupos se envían a la interfaz en lotes para no bloquear el hilo de Tk
+BATCH_SIZE = 200
+BATCH_INTERVAL = 0.25
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class AnalysisJob:
+    """Ejecuta un análisis en un hilo aparte.
+
+    work(job) debe devolver un iterable de grupos y llamar a job.progress() de vez
+    en cuando; progress() lanza JobCancelled si se pidió cancelar. La interfaz lee
+    job.events (("groups", lote), ("done", None), ("cancelled", None), ("error", e)).
+    work puede dejar en job.result / job.session datos para reutilizar después
+    (el grafo y las canciones escaneadas). job.profile guarda el tiempo de cada etapa
+    y los contadores; con cprofile=True también un perfil de cProfile del hilo.
+    """
+
+    def __init__(self, work, cprofile=False):
+        self.work = work
+        self.events = queue.Queue()
+        self.stats = {}
+        self.result = None
+        self.session = None
+        self.stage = "scan"
+        self.done = 0
+        self.total = 0
+        self.files = 0
+        self.groups = 0
+        self.started = time.monotonic()
+        self.stage_started = self.started
+        self.finished = None
+        self.profile = Profile(cprofile)
+        self.profile.enter(self.stage, self.started)
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def progress(self, stage, done, total=0):
+        if stage != self.stage:
+            self.stage = stage
+            self.stage_started = time.monotonic()
+            self.profile.enter(stage, self.stage_started)
+        self.done = done
+        self.total = total
+        if stage == "scan":
+            self.files = done
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def eta(self):
+        # Estimación lineal sobre el avance de la etapa actual
+        if not self.total or not self.done:
+            return None
+        elapsed = time.monotonic() - self.stage_started
+        return elapsed * (self.total - self.done) / self.done
+
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def _finish(self):
+        self.finished = time.monotonic()
+        self.profile.stop_cprofile()
+        self.profile.finish(self.finished)
+        self.profile.update(self.stats)
+        self.profile.counters["groups"] = self.groups
+
+    def _run(self):
+        batch = []
+        last_flush = time.monotonic()
+        try:
+            # Dentro del try: en Python 3.12+ enable() falla si ya hay otro perfilador activo
+            self.profile.start_cprofile()
+            for group in self.work(self):
+                if self._cancel.is_set():
+                    raise JobCancelled()
+                batch.append(group)
+                self.groups += 1
+                now = time.monotonic()
+                if len(batch) >= BATCH_SIZE or now - last_flush >= BATCH_INTERVAL:
+                    self.events.put(("groups", batch))
+                    batch = []
+                    last_flush = now
+            if batch:
+                self.events.put(("groups", batch))
+            self._finish()
+            self.events.put(("done", None))
+        except JobCancelled:
+            self._finish()
+            self.events.put(("cancelled", None))
+        except Exception as e:
+            self._finish()
+            self.events.put(("error", e))
+
+
+class SyncJob:
+    """Mismo interfaz de progreso que AnalysisJob, pero en el hilo actual (sin Tk).
+
+    Guarda el tiempo de cada etapa en profile para el resumen de la línea de comandos.
+    Con cprofile=True se perfila desde el primer progress() hasta finish(): así un fallo
+    al arrancar cProfile sale del bucle del análisis como cualquier otro error.
+    """
+
+    def __init__(self, cprofile=False):
+        self.stats = {}
+        self.result = None
+        self.session = None
+        self.stage = None
+        self.files = 0
+        self.groups = 0
+        self.profile = Profile(cprofile)
+
+    @property
+    def timings(self):
+        return self.profile.timings
+
+    def progress(self, stage, done, total=0):
+        if stage != self.stage:
+            if self.stage is None:
+                self.profile.start_cprofile()
+            self.profile.enter(stage)
+            self.stage = stage
+        if stage == "scan":
+            self.files = done
+
+    def finish(self):
+        self.profile.stop_cprofile()
+        self.profile.finish()
+        self.stage = None
+        self.profile.update(self.stats)
+        self.profile.counters["groups"] = self.groups
@@ -0,0 +1,137 @@
+import multiprocessing
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from repetiscan.similarity import RatioIndex, TokenIndex, iter_ratio_groups, iter_word_groups, row_pairs
+
+# Comparación repartida entre procesos. Cada proceso recibe una sola vez los títulos
+# limpios (un str con todos los títulos seguidos + sus longitudes) y devuelve las
+# aristas de bloques de filas en arrays. Los bloques se recogen en orden, así que las
+# aristas salen ordenadas por (i, j) igual que iter_ratio_edges / iter_word_edges y
+# el recorrido voraz posterior da exactamente los mismos grupos que un solo proceso.
+
+DEFAULT_PROCESSES = os.cpu_count() or 1
+# Por debajo de estas filas arrancar procesos cuesta más de lo que se gana
+MIN_PARALLEL_ROWS = 2000
+CHUNK_ROWS = 256
+# Bloques pendientes por proceso (limita la memoria de aristas aún sin consumir)
+PREFETCH = 4
+
+_index = None
+_kind = None
+
+
+def pack_titles(cleaned):
+    return "".join(cleaned), array('L', (len(c) for c in cleaned))
+
+
+def unpack_titles(text, lengths):
+    cleaned = []
+    pos = 0
+    for length in lengths:
+        cleaned.append(text[pos:pos + length])
+        pos += length
+    return cleaned
+
+
+def _init_worker(kind, text, lengths):
+    global _index, _kind
+    cleaned = unpack_titles(text, lengths)
+    _kind = kind
+    _index = RatioIndex(cleaned) if kind == "ratio" else TokenIndex(cleaned)
+
+
+def _compare_rows(start, end, floor_value):
+    rows, targets = array('L'), array('L')
+    weights = array('d') if _kind == "ratio" else array('L')
+    compared = 0
+    for i in range(start, end):
+        if _kind == "ratio":
+            found, compared_i = _index.matches(i, floor_value)
+        else:
+            shared = _index.shared_counts(i)
+            compared_i = len(shared)
+            found = [(j, shared[j]) for j in sorted(shared) if shared[j] >= floor_value]
+        compared += compared_i
+        for j, weight in found:
+            rows.append(i)
+            targets.append(j)
+            weights.append(weight)
+    return compared, rows, targets, weights
+
+
+def iter_parallel_edges(kind, cleaned, floor_value, processes=DEFAULT_PROCESSES, stats=None, progress=None,
+                        chunk_rows=CHUNK_ROWS):
+    # (i, j, peso) ordenadas por (i, j); kind es "ratio" (peso = ratio) o "words" (palabras en común)
+    n = len(cleaned)
+    compared = done = 0
+    # "spawn" también en Linux: se lanza desde el hilo del análisis y fork con hilos no es seguro
+    pool = ProcessPoolExecutor(max_workers=max(1, processes), mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(kind,) + pack_titles(cleaned))
+    try:
+        chunks = iter(range(0, n, chunk_rows))
+        pending = deque()
+        for start in chunks:
+            pending.append((start, pool.submit(_compare_rows, start, min(n, start + chunk_rows), floor_value)))
+            if len(pending) >= processes * PREFETCH:
+                break
+        if progress is not None:
+            progress(0, n)
+        while pending:
+            start, future = pending.popleft()
+            compared_chunk, rows, targets, weights = future.result()
+            next_start = next(chunks, None)
+            if next_start is not None:
+                pending.append((next_start, pool.submit(_compare_rows, next_start, min(n, next_start + chunk_rows), floor_value)))
+            compared += compared_chunk
+            yield from zip(rows, targets, weights)
+            done = min(n, start + chunk_rows)
+            if progress is not None:
+                progress(done, n)
+    finally:
+        # Al cancelar no se espera a los bloques que faltan
+        pool.shutdown(wait=False, cancel_futures=True)
+        if stats is not None:
+            stats["pairs_compared"] = stats.get("pairs_compared", 0) + compared
+            # Como en iter_ratio_edges, sobre las filas ya entregadas (al cancelar no cuentan las demás)
+            stats["edge_pairs_pruned"] = stats.get("edge_pairs_pruned", 0) + row_pairs(done, n) - compared
+
+
+def iter_groups_from_edges(n, edges, threshold):
+    # Mismo algoritmo voraz que iter_ratio_groups / iter_word_groups, sobre aristas ordenadas
+    seen = bytearray(n)
+    row, group = -1, None
+    for i, j, weight in edges:
+        if i != row:
+            if group is not None and len(group) > 1:
+                yield group
+            row = i
+            group = None if seen[i] else [i]
+            seen[i] = 1
+        if group is not None and weight >= threshold and not seen[j]:
+            seen[j] = 1
+            group.append(j)
+    if group is not None and len(group) > 1:
+        yield group
+
+
+def use_parallel(n, processes):
+    return processes is not None and processes > 1 and n >= MIN_PARALLEL_ROWS
+
+
+def sharded_ratio_groups(cleaned, threshold, stats=None, progress=None, processes=DEFAULT_PROCESSES):
+    # Como iter_ratio_groups; con pocos títulos o un solo proceso es exactamente esa función.
+    # Con umbral <= 0 todos los pares serían aristas, así que tampoco se reparte.
+    if threshold <= 0 or not use_parallel(len(cleaned), processes):
+        return iter_ratio_groups(cleaned, threshold, stats, progress)
+    edges = iter_parallel_edges("ratio", cleaned, threshold, processes, stats, progress)
+    return iter_groups_from_edges(len(cleaned), edges, threshold)
+
+
+def sharded_word_groups(cleaned, min_overlap, stats=None, progress=None, token_sets=None, processes=DEFAULT_PROCESSES):
+    if min_overlap <= 0 or not use_parallel(len(cleaned), processes):
+        return iter_word_groups(cleaned, min_overlap, stats, progress=progress, token_sets=token_sets)
+    edges = iter_parallel_edges("words", cleaned, min_overlap, processes, stats, progress)
+    return iter_groups_from_edges(len(cleaned), edges, min_overlap)
@@ -0,0 +1,101 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+# Tiempos por fase y contadores de un análisis. Los trabajos (jobs.py) abren una fase
+# nueva cada vez que cambia la etapa de progress(); core.py añade los contadores en
+# job.stats. Opcionalmente se escribe una traza JSON (formato Trace Event, se abre en
+# chrome://tracing o Perfetto) y un volcado de cProfile del hilo del análisis.
+
+TRACE_FILE = "repetiscan_trace.json"
+PROFILE_FILE = "repetiscan.prof"
+# Contadores que se muestran en el resumen, en este orden
+REPORT_COUNTERS = ("files_scanned", "cache_hits", "read_errors", "pairs_compared", "pairs_pruned", "edge_pairs_pruned", "groups")
+
+
+class Profile:
+    """Fases (nombre, inicio, fin) y contadores de un análisis."""
+
+    def __init__(self, cprofile=False):
+        self.started = time.monotonic()
+        self.spans = []
+        self.counters = {}
+        self.phase = None
+        self._phase_started = self.started
+        self._lock = threading.Lock()
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.cprofile_started = False
+
+    def enter(self, phase, now=None):
+        # Cierra la fase actual y abre otra; con phase=None sólo se cierra
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.phase is not None:
+                self.spans.append((self.phase, self._phase_started, now))
+            self.phase = phase
+            self._phase_started = now
+
+    def finish(self, now=None):
+        self.enter(None, now)
+
+    @property
+    def timings(self):
+        timings = {}
+        with self._lock:
+            spans = list(self.spans)
+            if self.phase is not None:
+                spans.append((self.phase, self._phase_started, time.monotonic()))
+        for phase, start, end in spans:
+            timings[phase] = timings.get(phase, 0.0) + end - start
+        return timings
+
+    def update(self, counters):
+        for name, value in counters.items():
+            if isinstance(value, (int, float)):
+                self.counters[name] = value
+
+    # cProfile sólo perfila el hilo que llama a enable(): hay que arrancarlo en el del análisis
+    def start_cprofile(self):
+        if self.cprofile is not None:
+            self.cprofile.enable()
+            self.cprofile_started = True
+
+    def stop_cprofile(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+    def report(self):
+        phases = ", ".join(f"{phase} {seconds:.2f} s" for phase, seconds in self.timings.items())
+        counters = ", ".join(f"{name} {self.counters[name]}" for name in REPORT_COUNTERS if name in self.counters)
+        return " · ".join(part for part in (phases, counters) if part)
+
+    def to_dict(self):
+        return {
+            "timings": {phase: round(seconds, 6) for phase, seconds in self.timings.items()},
+            "counters": dict(self.counters),
+        }
+
+    def write_trace(self, path=TRACE_FILE):
+        pid = os.getpid()
+        events = [{"name": phase, "cat": "phase", "ph": "X", "pid": pid, "tid": 1,
+                   "ts": round((start - self.started) * 1e6), "dur": round((end - start) * 1e6)}
+                  for phase, start, end in self.spans]
+        end = self.spans[-1][2] if self.spans else self.started
+        events.append({"name": "counters", "ph": "C", "pid": pid, "tid": 1,
+                       "ts": round((end - self.started) * 1e6), "args": dict(self.counters)})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "otherData": self.to_dict()}, f, indent=1)
+
+    def dump_cprofile(self, path=PROFILE_FILE, top=25):
+        # Guarda el .prof (para snakeviz / pstats) y devuelve las funciones más costosas en texto;
+        # nada si cProfile no llegó a arrancar
+        if self.cprofile is None or not self.cprofile_started:
+            return ""
+        self.cprofile.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(self.cprofile, stream=out).sort_stats("cumulative").print_stats(top)
+        return out.getvalue()
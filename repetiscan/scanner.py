@@ -0,0 +1,102 @@
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from mutagen.easyid3 import EasyID3
+from mutagen.mp3 import MP3
+from repetiscan.tagreader import read_title_artist
+
+# La lectura de etiquetas es sobre todo espera de disco/red, así que se usan hilos
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+ScanError = namedtuple("ScanError", ["path", "message"])
+
+
+def iter_mp3_files(folder, errors=None):
+    # Recorre subcarpetas (Artista/Álbum/Pista) en orden estable: (path, size, mtime_ns)
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            if errors is not None:
+                errors.append(ScanError(current, str(e)))
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith('.mp3') and entry.is_file():
+                    st = entry.stat()
+                    yield entry.path, st.st_size, st.st_mtime_ns
+            except OSError as e:
+                if errors is not None:
+                    errors.append(ScanError(entry.path, str(e)))
+        stack.extend(reversed(subdirs))
+
+
+def read_tags(filepath, stats=None):
+    tags = read_title_artist(filepath, stats)
+    if tags is not None:
+        title, artist = tags
+        if title is None:
+            title = os.path.splitext(os.path.basename(filepath))[0]
+        return title, artist
+    return read_tags_mutagen(filepath)
+
+
+def read_tags_mutagen(filepath):
+    audio = MP3(filepath, ID3=EasyID3)
+    title = audio.get("title", [os.path.splitext(os.path.basename(filepath))[0]])[0]
+    artist = audio.get("artist", [""])[0]
+    return title, artist
+
+
+def scan_songs(folder, workers=DEFAULT_WORKERS, cache=None, errors=None, stats=None):
+    # Genera (title, path, artist) a medida que se leen, en el mismo orden que el recorrido.
+    # La caché se consulta en este hilo; sólo los fallos se leen en el pool.
+    # stats cuenta cache_hits y tags_read (archivos leídos del disco).
+    pending = deque()
+    window = max(1, workers) * 4
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        try:
+            for filepath, size, mtime in iter_mp3_files(folder, errors):
+                cached = cache.get(filepath, size, mtime) if cache is not None else None
+                if cached is not None:
+                    pending.append((filepath, size, mtime, None, cached))
+                else:
+                    pending.append((filepath, size, mtime, pool.submit(read_tags, filepath), None))
+                if stats is not None:
+                    key = "cache_hits" if cached is not None else "tags_read"
+                    stats[key] = stats.get(key, 0) + 1
+                while len(pending) > window or (pending and pending[0][3] is None):
+                    song = _collect(pending.popleft(), cache, errors)
+                    if song is not None:
+                        yield song
+            while pending:
+                song = _collect(pending.popleft(), cache, errors)
+                if song is not None:
+                    yield song
+        finally:
+            for item in pending:
+                if item[3] is not None:
+                    item[3].cancel()
+            if cache is not None:
+                cache.commit()
+
+
+def _collect(item, cache, errors):
+    filepath, size, mtime, future, cached = item
+    if future is None:
+        return cached[0], filepath, cached[1]
+    try:
+        title, artist = future.result()
+    except Exception as e:
+        if errors is not None:
+            errors.append(ScanError(filepath, str(e)))
+        return None
+    if cache is not None:
+        cache.put(filepath, size, mtime, title, artist)
+    return title, filepath, artist
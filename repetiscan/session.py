@@ -0,0 +1,106 @@
+import threading
+
+from repetiscan.blacklist import BlacklistNormalizer
+from repetiscan.similarity import word_sets
+from repetiscan.songstore import SongStore
+
+
+class ScanSession:
+    """Canciones de una carpeta ya escaneada, compartidas por todos los modos.
+
+    Las canciones van en un SongStore (ids enteros en vez de tuplas). Guarda los
+    títulos limpios y las palabras de cada título (por versión de la blacklist; los
+    títulos limpios iguales comparten objeto) y un índice artista en minúsculas ->
+    canciones. Se descarta al cambiar de carpeta o al pedir un nuevo escaneo. El modo
+    vigilancia (watch.py) añade y quita canciones desde otro hilo con el lock tomado.
+    Sin el lock sólo se puede leer el store: add() lo amplía en su sitio y cada
+    canción cuenta en len() cuando ya está completa; discard() pone uno nuevo en
+    session.songs, y los ids de quien siga con el anterior sólo valen para ese.
+    """
+
+    def __init__(self, folder, songs, errors=None):
+        self.folder = folder
+        self.songs = songs if isinstance(songs, SongStore) else SongStore(songs)
+        self.errors = list(errors or [])
+        self.lock = threading.RLock()
+        self._blacklist_key = None
+        self._clean = None
+        self._cleaned = None
+        self._token_sets = None
+        self._artists = None
+
+    def cleaned(self, blacklist):
+        key = tuple(blacklist.items())
+        with self.lock:
+            if key != self._blacklist_key:
+                self._clean = BlacklistNormalizer(blacklist).clean
+                self._cleaned = _shared([self._clean(title) for title in self.songs.titles()])
+                self._token_sets = None
+                self._blacklist_key = key
+            return self._cleaned
+
+    def token_sets(self, blacklist):
+        with self.lock:
+            cleaned = self.cleaned(blacklist)
+            if self._token_sets is None:
+                self._token_sets = word_sets(cleaned)
+            return self._token_sets
+
+    def artist_index(self):
+        with self.lock:
+            if self._artists is None:
+                by_id = {}
+                for k, artist_id in enumerate(self.songs.artist_ids):
+                    by_id.setdefault(artist_id, []).append(k)
+                artists = {}
+                for artist_id, ids in by_id.items():
+                    artists.setdefault((self.songs.artists[artist_id] or '').lower(), []).extend(ids)
+                self._artists = artists
+            return self._artists
+
+    def songs_excluding_artist(self, excluded):
+        # Misma regla que antes (excluido si el texto aparece en el artista), pero
+        # se comprueba una vez por artista distinto y no por canción
+        with self.lock:
+            kept = []
+            for artist, ids in self.artist_index().items():
+                if excluded not in artist:
+                    kept.extend(ids)
+            kept.sort()
+            return [self.songs[k] for k in kept]
+
+    def add(self, songs):
+        # Añade canciones al final sin rehacer las cachés; devuelve el id de la primera
+        with self.lock:
+            start = len(self.songs)
+            self.songs.extend(songs)
+            if self._cleaned is not None:
+                new = [self._clean(self.songs.title(k)) for k in range(start, len(self.songs))]
+                self._cleaned = self._cleaned + new
+                if self._token_sets is not None:
+                    self._token_sets = self._token_sets + word_sets(new)
+            self._artists = None
+            return start
+
+    def discard(self, paths):
+        # Quita canciones borradas; devuelve los ids que quedan (en orden, pasan a ser
+        # 0, 1, 2...) para renumerar otros índices, o None si no se quitó nada
+        with self.lock:
+            gone = set(self.songs.ids_of(paths))
+            if not gone:
+                return None
+            kept = [k for k in range(len(self.songs)) if k not in gone]
+            self.songs = self.songs.select(kept)
+            # Los títulos limpios y las palabras se conservan, sólo cambian de posición
+            if self._cleaned is not None:
+                self._cleaned = [self._cleaned[k] for k in kept]
+            if self._token_sets is not None:
+                self._token_sets = [self._token_sets[k] for k in kept]
+            self._artists = None
+            return kept
+
+
+def _shared(cleaned):
+    # En una biblioteca con duplicados muchos títulos limpios se repiten: una sola copia
+    memo = {}
+    return [memo.setdefault(c, c) for c in cleaned]
@@ -0,0 +1,294 @@
+import difflib
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from math import ceil, floor
+
+# Motores de agrupación sobre títulos ya limpiados. Trabajan con índices y
+# reproducen exactamente el algoritmo voraz original: cada título no visto abre
+# un grupo y se lleva todos los títulos posteriores no vistos que superen el umbral.
+# progress(filas_hechas, filas_totales) se llama cada 64 filas.
+
+
+def _ratio_bound(la, lb):
+    # Igual que difflib: 2.0 * coincidencias / longitud total
+    length = la + lb
+    return 2.0 * min(la, lb) / length if length else 1.0
+
+
+def _length_window(la, threshold):
+    # Longitudes lb que pueden cumplir 2*min(la, lb)/(la + lb) >= threshold (con margen)
+    if threshold <= 0:
+        return 0, float("inf")
+    if threshold >= 2:
+        return la, la
+    return floor(la * threshold / (2 - threshold)) - 1, ceil(la * (2 - threshold) / threshold) + 1
+
+
+def id_map(kept, size):
+    # Id antiguo -> id nuevo (-1 si se quita) cuando sólo quedan los ids de kept, en orden
+    new_ids = [-1] * size
+    for new, k in enumerate(kept):
+        new_ids[k] = new
+    return new_ids
+
+
+class RatioIndex:
+    """Bloques por longitud + cotas rápidas antes de SequenceMatcher.ratio()."""
+
+    def __init__(self, cleaned):
+        self.cleaned = cleaned
+        self.lengths = [len(c) for c in cleaned]
+        self.order = sorted(range(len(cleaned)), key=lambda k: (self.lengths[k], k))
+        self.sorted_lengths = [self.lengths[k] for k in self.order]
+        self.counts = [None] * len(cleaned)
+
+    def extend(self, cleaned):
+        # Añade los títulos del final de cleaned que aún no están (modo vigilancia);
+        # sus ids son los mayores, así que van detrás de los de su misma longitud
+        for k in range(len(self.lengths), len(cleaned)):
+            la = len(cleaned[k])
+            pos = bisect_right(self.sorted_lengths, la)
+            self.order.insert(pos, k)
+            self.sorted_lengths.insert(pos, la)
+            self.lengths.append(la)
+            self.counts.append(None)
+        self.cleaned = cleaned
+
+    def select(self, kept, cleaned):
+        # Se queda con los ids de kept renumerados como SongStore.select; cleaned ya es la lista nueva
+        new_ids = id_map(kept, len(self.lengths))
+        self.order = [new_ids[k] for k in self.order if new_ids[k] >= 0]
+        self.lengths = [self.lengths[k] for k in kept]
+        self.sorted_lengths = [self.lengths[k] for k in self.order]
+        self.counts = [self.counts[k] for k in kept]
+        self.cleaned = cleaned
+
+    def _count(self, k):
+        if self.counts[k] is None:
+            self.counts[k] = Counter(self.cleaned[k])
+        return self.counts[k]
+
+    def matches(self, i, threshold, seen=None, after=None):
+        # ([(j, ratio)] con j > i y ratio >= threshold, pares en los que se calculó ratio).
+        # Con after se buscan los j > after distintos de i (after=-1: todos los demás).
+        lengths = self.lengths
+        la = lengths[i]
+        lo, hi = _length_window(la, threshold)
+        start = bisect_left(self.sorted_lengths, lo)
+        end = bisect_right(self.sorted_lengths, hi) if hi != float("inf") else len(self.order)
+        if after is not None:
+            candidates = sorted(k for k in self.order[start:end] if k > after and k != i and (seen is None or not seen[k]))
+        elif seen is None:
+            candidates = sorted(k for k in self.order[start:end] if k > i)
+        else:
+            candidates = sorted(k for k in self.order[start:end] if k > i and not seen[k])
+        clean_i = self.cleaned[i]
+        count_i = self._count(i)
+        found = []
+        compared = 0
+        for j in candidates:
+            lb = lengths[j]
+            if _ratio_bound(la, lb) < threshold:
+                continue
+            count_j = self._count(j)
+            small, large = (count_i, count_j) if len(count_i) <= len(count_j) else (count_j, count_i)
+            matches = sum(min(v, large[c]) for c, v in small.items())
+            length = la + lb
+            if (2.0 * matches / length if length else 1.0) < threshold:
+                continue
+            compared += 1
+            score = difflib.SequenceMatcher(None, clean_i, self.cleaned[j]).ratio()
+            if score >= threshold:
+                found.append((j, score))
+        return found, compared
+
+
+def word_sets(cleaned):
+    # Palabras distintas de cada título, como tuplas: ocupan menos que un set y sólo se
+    # recorren. Cada palabra se guarda una vez y los títulos iguales comparten la tupla.
+    words, memo, result = {}, {}, []
+    for c in cleaned:
+        tokens = memo.get(c)
+        if tokens is None:
+            tokens = memo[c] = tuple(words.setdefault(w, w) for w in dict.fromkeys(c.split()))
+        result.append(tokens)
+    return result
+
+
+class TokenIndex:
+    """Índice invertido palabra -> canciones (listas ordenadas por id)."""
+
+    def __init__(self, cleaned, skip_tokens=None, max_postings=None, token_sets=None):
+        skip = set(skip_tokens or ())
+        self.token_sets = token_sets if token_sets is not None else word_sets(cleaned)
+        postings = {}
+        for k, tokens in enumerate(self.token_sets):
+            for token in tokens:
+                if token not in skip:
+                    postings.setdefault(token, []).append(k)
+        if max_postings is not None:
+            skip.update(token for token, ids in postings.items() if len(ids) > max_postings)
+            postings = {token: ids for token, ids in postings.items() if len(ids) <= max_postings}
+        self.postings = postings
+        self.skip = skip
+
+    def extend(self, token_sets):
+        # Añade las canciones del final de token_sets que aún no están (modo vigilancia);
+        # las listas siguen ordenadas porque los ids nuevos son los mayores
+        postings, skip = self.postings, self.skip
+        for k in range(len(self.token_sets), len(token_sets)):
+            for token in token_sets[k]:
+                if token not in skip:
+                    postings.setdefault(token, []).append(k)
+        self.token_sets = token_sets
+
+    def select(self, kept, token_sets):
+        # Se queda con los ids de kept renumerados como SongStore.select
+        new_ids = id_map(kept, len(self.token_sets))
+        postings = {}
+        for token, ids in self.postings.items():
+            ids = [new_ids[k] for k in ids if new_ids[k] >= 0]
+            if ids:
+                postings[token] = ids
+        self.postings = postings
+        self.token_sets = token_sets
+
+    def shared_counts(self, i, seen=None, after=None):
+        # {j: palabras compartidas} sólo para j > i (o j > after, j != i) que aparecen en alguna lista de i
+        shared = {}
+        start = i if after is None else after
+        for token in self.token_sets[i]:
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            for k in ids[bisect_right(ids, start):]:
+                if seen is None or not seen[k]:
+                    shared[k] = shared.get(k, 0) + 1
+        shared.pop(i, None)
+        return shared
+
+
+def iter_ratio_groups(cleaned, threshold, stats=None, progress=None):
+    n = len(cleaned)
+    index = RatioIndex(cleaned)
+    seen = bytearray(n)
+    remaining = n
+    compared = pruned = 0
+    try:
+        for i in range(n):
+            if progress is not None and not i & 63:
+                progress(i, n)
+            if seen[i]:
+                continue
+            seen[i] = 1
+            remaining -= 1
+            # El algoritmo exhaustivo compararía i con todos los no vistos posteriores
+            exhaustive = remaining
+            found, compared_i = index.matches(i, threshold, seen)
+            group = [i]
+            for j, _ in found:
+                group.append(j)
+                seen[j] = 1
+            remaining -= len(found)
+            compared += compared_i
+            pruned += exhaustive - compared_i
+            if len(group) > 1:
+                yield group
+        if progress is not None:
+            progress(n, n)
+    finally:
+        if stats is not None:
+            stats["pairs_compared"] = stats.get("pairs_compared", 0) + compared
+            stats["pairs_pruned"] = stats.get("pairs_pruned", 0) + pruned
+
+
+def iter_word_groups(cleaned, min_overlap, stats=None, skip_tokens=None, max_postings=None, progress=None, token_sets=None):
+    # Sólo se cuentan palabras compartidas entre canciones que coinciden en alguna lista.
+    # skip_tokens / max_postings ignoran palabras muy comunes ("the", "feat"); cambian el resultado.
+    n = len(cleaned)
+    index = TokenIndex(cleaned, skip_tokens, max_postings, token_sets)
+    seen = bytearray(n)
+    remaining = n
+    compared = pruned = 0
+    try:
+        for i in range(n):
+            if progress is not None and not i & 63:
+                progress(i, n)
+            if seen[i]:
+                continue
+            seen[i] = 1
+            remaining -= 1
+            exhaustive = remaining
+            if min_overlap <= 0:
+                # Cualquier par cumple: el primero se lleva a todos los restantes
+                group = [i] + [k for k in range(i + 1, n) if not seen[k]]
+                compared_i = len(group) - 1
+            else:
+                shared = index.shared_counts(i, seen)
+                compared_i = len(shared)
+                group = [i] + sorted(k for k, count in shared.items() if count >= min_overlap)
+            for k in group[1:]:
+                seen[k] = 1
+            remaining -= len(group) - 1
+            compared += compared_i
+            pruned += exhaustive - compared_i
+            if len(group) > 1:
+                yield group
+        if progress is not None:
+            progress(n, n)
+    finally:
+        if stats is not None:
+            stats["pairs_compared"] = stats.get("pairs_compared", 0) + compared
+            stats["pairs_pruned"] = stats.get("pairs_pruned", 0) + pruned
+
+
+def row_pairs(rows, n):
+    # Pares i < j de las primeras rows filas: los que compararía la búsqueda exhaustiva de aristas
+    return rows * (n - 1) - rows * (rows - 1) // 2
+
+
+def iter_ratio_edges(cleaned, floor_threshold, stats=None, progress=None):
+    # Todos los pares i < j con ratio >= floor_threshold: (i, j, ratio), ordenados por (i, j)
+    n = len(cleaned)
+    index = RatioIndex(cleaned)
+    compared = rows = 0
+    try:
+        for i in range(n):
+            if progress is not None and not i & 63:
+                progress(i, n)
+            found, compared_i = index.matches(i, floor_threshold)
+            compared += compared_i
+            for j, score in found:
+                yield i, j, score
+            rows += 1
+        if progress is not None:
+            progress(n, n)
+    finally:
+        if stats is not None:
+            stats["pairs_compared"] = stats.get("pairs_compared", 0) + compared
+            # No es pairs_pruned: aquí se buscan todos los pares, no sólo los que quedan sin grupo
+            stats["edge_pairs_pruned"] = stats.get("edge_pairs_pruned", 0) + row_pairs(rows, n) - compared
+
+
+def iter_word_edges(cleaned, min_shared=1, stats=None, skip_tokens=None, max_postings=None, progress=None, token_sets=None):
+    # Todos los pares i < j con al menos min_shared palabras en común: (i, j, compartidas)
+    n = len(cleaned)
+    index = TokenIndex(cleaned, skip_tokens, max_postings, token_sets)
+    compared = rows = 0
+    try:
+        for i in range(n):
+            if progress is not None and not i & 63:
+                progress(i, n)
+            shared = index.shared_counts(i)
+            compared += len(shared)
+            for j in sorted(shared):
+                if shared[j] >= min_shared:
+                    yield i, j, shared[j]
+            rows += 1
+        if progress is not None:
+            progress(n, n)
+    finally:
+        if stats is not None:
+            stats["pairs_compared"] = stats.get("pairs_compared", 0) + compared
+            # No es pairs_pruned: aquí se buscan todos los pares, no sólo los que quedan sin grupo
+            stats["edge_pairs_pruned"] = stats.get("edge_pairs_pruned", 0) + row_pairs(rows, n) - compared
@@ -0,0 +1,137 @@
+import os
+from array import array
+
+# Los textos se guardan en UTF-8; surrogatepass conserva también las rutas con bytes
+# que no son UTF-8 válido (os.fsdecode las representa con sustitutos sueltos)
+ENCODING = "utf-8"
+ERRORS = "surrogatepass"
+_SEPARATORS = {os.sep, os.altsep or os.sep}
+
+
+class SongStore:
+    """Canciones de una carpeta en poco espacio, identificadas por su posición (id).
+
+    Títulos y nombres de archivo van seguidos en dos bytearray con sus desplazamientos
+    en array; las carpetas y los artistas se guardan una sola vez y cada canción
+    apunta a ellos por número. store[k] reconstruye la tupla (title, path, artist) de
+    siempre, así que se puede usar donde antes había una lista de tuplas; las
+    búsquedas trabajan con ids y sólo se crean tuplas para los grupos que se muestran.
+    Sólo se añade al final: los ids de una canción no cambian mientras exista el store.
+    """
+
+    def __init__(self, songs=()):
+        self._titles = bytearray()
+        self._title_ends = array('L')
+        self._names = bytearray()
+        self._name_ends = array('L')
+        self.dir_ids = array('I')
+        self.artist_ids = array('I')
+        self.dirs = []
+        self.artists = []
+        self._dir_index = {}
+        self._artist_index = {}
+        self.extend(songs)
+
+    def _intern(self, value, values, index):
+        k = index.get(value)
+        if k is None:
+            k = index[value] = len(values)
+            values.append(value)
+        return k
+
+    def append(self, title, path, artist):
+        # Devuelve el id de la canción; la carpeta se guarda con su separador final.
+        # _title_ends (que da len()) crece lo último: quien lea sin el lock no ve la
+        # canción hasta que está completa
+        cut = _cut(path)
+        self._titles += title.encode(ENCODING, ERRORS)
+        self._names += path[cut:].encode(ENCODING, ERRORS)
+        self._name_ends.append(len(self._names))
+        self.dir_ids.append(self._intern(path[:cut], self.dirs, self._dir_index))
+        self.artist_ids.append(self._intern(artist, self.artists, self._artist_index))
+        self._title_ends.append(len(self._titles))
+        return len(self._title_ends) - 1
+
+    def extend(self, songs):
+        for title, path, artist in songs:
+            self.append(title, path, artist)
+
+    def select(self, ids):
+        # Store nuevo sólo con esas canciones (los ids se renumeran). Se copian los bytes
+        # y los números tal cual; carpetas y artistas se conservan todos
+        store = SongStore()
+        store._titles, store._title_ends = _copy(self._titles, self._title_ends, ids)
+        store._names, store._name_ends = _copy(self._names, self._name_ends, ids)
+        store.dir_ids = array('I', [self.dir_ids[k] for k in ids])
+        store.artist_ids = array('I', [self.artist_ids[k] for k in ids])
+        store.dirs, store._dir_index = list(self.dirs), dict(self._dir_index)
+        store.artists, store._artist_index = list(self.artists), dict(self._artist_index)
+        return store
+
+    def ids_of(self, paths):
+        # Ids de esas rutas sin decodificar las demás: sólo se miran las canciones de sus carpetas
+        wanted = {}
+        for path in paths:
+            cut = _cut(path)
+            d = self._dir_index.get(path[:cut])
+            if d is not None:
+                wanted.setdefault(d, set()).add(path[cut:].encode(ENCODING, ERRORS))
+        names, ends = self._names, self._name_ends
+        found = []
+        for k, d in enumerate(self.dir_ids):
+            if d in wanted and bytes(names[ends[k - 1] if k > 0 else 0:ends[k]]) in wanted[d]:
+                found.append(k)
+        return found
+
+    def __len__(self):
+        return len(self._title_ends)
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += len(self)
+        return self.title(k), self.path(k), self.artists[self.artist_ids[k]]
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def title(self, k):
+        start = self._title_ends[k - 1] if k > 0 else 0
+        return self._titles[start:self._title_ends[k]].decode(ENCODING, ERRORS)
+
+    def path(self, k):
+        start = self._name_ends[k - 1] if k > 0 else 0
+        return self.dirs[self.dir_ids[k]] + self._names[start:self._name_ends[k]].decode(ENCODING, ERRORS)
+
+    def artist(self, k):
+        return self.artists[self.artist_ids[k]]
+
+    def titles(self):
+        return (self.title(k) for k in range(len(self)))
+
+    def paths(self):
+        return (self.path(k) for k in range(len(self)))
+
+
+def _cut(path):
+    return max(path.rfind(sep) for sep in _SEPARATORS) + 1
+
+
+def _copy(data, ends, ids):
+    # (bytes, desplazamientos) sólo con los textos de ids, en ese orden; los ids
+    # seguidos (lo normal tras quitar unas pocas canciones) se copian de una vez
+    ids = list(ids)
+    parts, new_ends, total = [], array('L'), 0
+    pos = 0
+    while pos < len(ids):
+        first = last = ids[pos]
+        pos += 1
+        while pos < len(ids) and ids[pos] == last + 1:
+            last += 1
+            pos += 1
+        start = ends[first - 1] if first > 0 else 0
+        parts.append(data[start:ends[last]])
+        shift = start - total
+        new_ends.extend([end - shift for end in ends[first:last + 1]])
+        total = new_ends[-1]
+    return bytearray(b"".join(parts)), new_ends
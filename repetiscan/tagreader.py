@@ -0,0 +1,178 @@
+import re
+import struct
+
+# Lector rápido de title/artist: sólo lee la cabecera ID3v2 y sus frames, y los
+# últimos 128 bytes (ID3v1). No recorre frames MPEG como hace mutagen.MP3.
+# Devuelve None cuando el archivo necesita el análisis completo de mutagen.
+
+_FRAME_ID = re.compile(rb"^[A-Z0-9]{3,4}$")
+_WANTED = {b"TIT2": "title", b"TPE1": "artist", b"TT2": "title", b"TP1": "artist"}
+_ENCODINGS = {0: "latin1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+
+def _syncsafe(data):
+    if any(b & 0x80 for b in data):
+        return None
+    value = 0
+    for b in data:
+        value = (value << 7) | b
+    return value
+
+
+def _unsynch(data):
+    return data.replace(b"\xff\x00", b"\xff")
+
+
+def _decode_text(data):
+    if not data:
+        return None
+    encoding = _ENCODINGS.get(data[0])
+    if encoding is None:
+        return None
+    data = data[1:]
+    values = []
+    if data[0:1] and encoding.startswith("utf-16"):
+        while data:
+            end = 0
+            while True:
+                end = data.find(b"\x00\x00", end)
+                if end == -1 or end % 2 == 0:
+                    break
+                end += 1
+            if end == -1:
+                chunk, data = data, b""
+            else:
+                chunk, data = data[:end], data[end + 2:]
+            values.append(chunk.decode(encoding))
+    else:
+        while data:
+            end = data.find(b"\x00")
+            if end == -1:
+                chunk, data = data, b""
+            else:
+                chunk, data = data[:end], data[end + 1:]
+            values.append(chunk.decode(encoding))
+    return values
+
+
+def _parse_frames(body, major):
+    found = {}
+    header_size = 6 if major == 2 else 10
+    id_size = 3 if major == 2 else 4
+    pos = 0
+    while pos + header_size <= len(body):
+        frame_id = body[pos:pos + id_size]
+        if frame_id[0:1] == b"\x00":
+            break  # padding
+        if not _FRAME_ID.match(frame_id) or len(frame_id) != id_size:
+            return None
+        if major == 2:
+            size = int.from_bytes(body[pos + 3:pos + 6], "big")
+            flags = 0
+        elif major == 3:
+            size, flags = struct.unpack(">IH", body[pos + 4:pos + 10])
+        else:
+            size = _syncsafe(body[pos + 4:pos + 8])
+            if size is None:
+                return None
+            flags = struct.unpack(">H", body[pos + 8:pos + 10])[0]
+        start = pos + header_size
+        pos = start + size
+        if pos > len(body):
+            return None
+        key = _WANTED.get(frame_id)
+        if key is None or key in found:
+            continue
+        data = body[start:pos]
+        if major == 3:
+            if flags & 0x00C0:  # comprimido o cifrado
+                return None
+            if flags & 0x0020:
+                data = data[1:]
+        elif major == 4:
+            if flags & 0x000C:
+                return None
+            if flags & 0x0040:
+                data = data[1:]
+            if flags & 0x0002:
+                data = _unsynch(data)
+            if flags & 0x0001:
+                data = data[4:]
+        try:
+            values = _decode_text(data)
+        except UnicodeDecodeError:
+            return None
+        if not values:
+            return None
+        found[key] = values[0]
+    return found
+
+
+def _is_frame_sync(header):
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return False
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate = header[2] >> 4
+    samplerate = (header[2] >> 2) & 0x03
+    return version != 1 and layer != 0 and bitrate not in (0, 15) and samplerate != 3
+
+
+def read_title_artist(filepath, stats=None):
+    # (title, artist) con title=None si no hay etiqueta de título
+    read = 0
+    found = {}
+    with open(filepath, "rb") as f:
+        header = f.read(10)
+        read += len(header)
+        audio_start = 0
+        if header[:3] == b"ID3":
+            major, flags = header[3], header[5]
+            size = _syncsafe(header[6:10])
+            if major not in (2, 3, 4) or size is None:
+                return None
+            if major == 2 and flags & 0x40:  # compresión en v2.2
+                return None
+            body = f.read(size)
+            read += len(body)
+            if len(body) < size:
+                return None
+            if flags & 0x80 and major < 4:
+                body = _unsynch(body)
+            if flags & 0x40 and major == 3:
+                ext_size = struct.unpack(">I", body[:4])[0]
+                body = body[4 + ext_size:]
+            elif flags & 0x40 and major == 4:
+                ext_size = _syncsafe(body[:4])
+                if ext_size is None:
+                    return None
+                body = body[ext_size:]
+            found = _parse_frames(body, major)
+            if found is None:
+                return None
+            audio_start = 10 + size + (10 if major == 4 and flags & 0x10 else 0)
+        # mutagen falla si no encuentra un frame MPEG; sin sincronía directa, que decida él
+        f.seek(audio_start)
+        sync = f.read(4)
+        read += len(sync)
+        if not _is_frame_sync(sync):
+            return None
+        if "title" not in found or "artist" not in found:
+            f.seek(0, 2)
+            if f.tell() - audio_start >= 131:
+                f.seek(-131, 2)
+                tail = f.read(131)
+                read += len(tail)
+                pos = tail.find(b"TAG")
+                if pos == 3:
+                    for key, start in (("title", 6), ("artist", 36)):
+                        value = tail[start:start + 30].split(b"\x00")[0].strip().decode("latin1")
+                        if value and key not in found:
+                            found[key] = value
+                elif pos != -1:
+                    return None
+            else:
+                return None
+    if stats is not None:
+        stats["bytes_read"] = stats.get("bytes_read", 0) + read
+    return found.get("title"), found.get("artist", "")
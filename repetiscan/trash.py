@@ -0,0 +1,266 @@
+"""Mover a la papelera por lotes, con un diario para revisar o restaurar cada lote.
+
+Uso: python -m repetiscan.trash [--journal trash_journal.jsonl] [--restore ID|last]
+
+Sin opciones lista los lotes del diario. Cada línea del diario es un objeto JSON
+{"batch", "time", "action": "trash"|"restore", "path", "error"}. Restaurar sólo
+funciona con la papelera de freedesktop (Linux y similares), que es la que usa
+send2trash allí; en Windows y macOS el diario sirve para saber qué se movió.
+"""
+import argparse
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+from send2trash import send2trash
+
+JOURNAL_FILE = "trash_journal.jsonl"
+DEFAULT_WORKERS = 4
+RESTORE_SUPPORTED = os.name == "posix" and sys.platform != "darwin"
+
+Batch = namedtuple("Batch", "id time trashed failed restored")
+
+
+def select_paths(groups, keep_one=False):
+    # Rutas a mover; con keep_one se conserva la primera canción de cada grupo
+    paths = []
+    for group in groups:
+        paths.extend(path for _, path, _ in group[1 if keep_one else 0:])
+    return list(dict.fromkeys(paths))
+
+
+def _name_key(path):
+    # send2trash elige el nombre dentro de la papelera ("x.mp3", "x 1.mp3", ...) sin
+    # bloqueo: dos hilos con el mismo nombre podrían pisarse, así que van al mismo hilo
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return re.sub(r" \d+$", "", stem).lower() + ext.lower()
+
+
+class TrashJob:
+    """Mueve archivos a la papelera en un hilo aparte, repartidos entre varios hilos.
+
+    Cada archivo se apunta en el diario en cuanto termina (también los que fallan),
+    así que un lote interrumpido queda registrado hasta donde llegó. La interfaz lee
+    done/total y espera ("done", None), ("cancelled", None) o ("error", excepción) en job.events; los
+    movidos quedan en job.trashed y los fallos en job.failures como (ruta, mensaje).
+    """
+
+    def __init__(self, paths, journal=JOURNAL_FILE, workers=DEFAULT_WORKERS):
+        self.paths = list(paths)
+        self.journal = journal
+        self.workers = max(1, workers)
+        self.batch = time.strftime("%Y%m%d-%H%M%S-") + os.urandom(2).hex()
+        self.events = queue.Queue()
+        self.total = len(self.paths)
+        self.done = 0
+        self.trashed = []
+        self.failures = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _trash_all(self, paths, journal):
+        for path in paths:
+            if self._cancel.is_set():
+                return
+            try:
+                send2trash(os.path.abspath(path))
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            with self._lock:
+                self.done += 1
+                if error is None:
+                    self.trashed.append(path)
+                else:
+                    self.failures.append((path, error))
+                try:
+                    _write(journal, self.batch, "trash", path, error)
+                except Exception:
+                    # Sin diario no se sigue moviendo nada: los demás hilos paran
+                    self._cancel.set()
+                    raise
+
+    def _run(self):
+        shards = {}
+        for path in self.paths:
+            shards.setdefault(_name_key(path), []).append(path)
+        try:
+            journal = open(self.journal, "a", encoding="utf-8")
+        except OSError as e:
+            # Sin diario no se mueve nada: no se podría restaurar
+            self.failures = [(path, str(e)) for path in self.paths]
+            self.events.put(("done", None))
+            return
+        error = None
+        try:
+            with journal, ThreadPoolExecutor(self.workers) as pool:
+                for future in [pool.submit(self._trash_all, paths, journal) for paths in shards.values()]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        # Lo ya movido queda en job.trashed
+                        error = error or e
+        except Exception as e:
+            error = error or e
+        finally:
+            if error is not None:
+                self.events.put(("error", error))
+            else:
+                self.events.put(("cancelled" if self._cancel.is_set() else "done", None))
+
+
+def _write(journal, batch, action, path, error=None):
+    entry = {"batch": batch, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "action": action, "path": path, "error": error}
+    journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    journal.flush()
+
+
+def read_batches(journal=JOURNAL_FILE):
+    # Lotes en orden; trashed sólo incluye lo que sigue en la papelera
+    batches = {}
+    try:
+        with open(journal, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue  # línea a medio escribir
+        batch = batches.setdefault(entry["batch"], Batch(entry["batch"], entry["time"], {}, [], []))
+        path = entry["path"]
+        if entry["error"] is not None:
+            if entry["action"] == "trash":
+                batch.failed.append((path, entry["error"]))
+        elif entry["action"] == "trash":
+            batch.trashed[path] = True
+        elif batch.trashed.pop(path, None):
+            batch.restored.append(path)
+    return [batch._replace(trashed=list(batch.trashed)) for batch in batches.values()]
+
+
+def _trash_dirs(path):
+    # Papelera del usuario y las de la unidad del archivo, con su carpeta base para
+    # las rutas relativas de los .trashinfo
+    data_home = os.path.expanduser(os.environ.get("XDG_DATA_HOME", "~/.local/share"))
+    dirs = [(os.path.join(data_home, "Trash"), data_home)]
+    top = os.path.realpath(os.path.dirname(path))
+    while not os.path.ismount(top):
+        top = os.path.dirname(top)
+    uid = str(os.getuid())
+    dirs += [(os.path.join(top, ".Trash", uid), top), (os.path.join(top, ".Trash-" + uid), top)]
+    return dirs
+
+
+def _trash_index(trash, top):
+    # ruta original -> [(fecha de borrado, nombre en la papelera)]
+    index = {}
+    info_dir = os.path.join(trash, "info")
+    try:
+        names = os.listdir(info_dir)
+    except OSError:
+        return index
+    for name in names:
+        if not name.endswith(".trashinfo"):
+            continue
+        try:
+            with open(os.path.join(info_dir, name), "r", encoding="utf-8") as f:
+                info = dict(line.rstrip("\n").split("=", 1) for line in f if "=" in line)
+        except (OSError, ValueError):
+            continue
+        original = os.path.join(top, unquote(info.get("Path", "")))
+        index.setdefault(os.path.normpath(original), []).append((info.get("DeletionDate", ""), name[:-len(".trashinfo")]))
+    return index
+
+
+def restore_paths(paths):
+    # Devuelve (restaurados, [(ruta, mensaje)]); si un archivo se borró varias veces
+    # se restaura la copia más reciente
+    if not RESTORE_SUPPORTED:
+        return [], [(path, "restore not supported on this system") for path in paths]
+    indexes = {}
+    restored, failures = [], []
+    for path in paths:
+        original = os.path.normpath(os.path.abspath(path))
+        if os.path.exists(original):
+            failures.append((path, "file already exists"))
+            continue
+        found = None
+        for trash, top in _trash_dirs(original):
+            if trash not in indexes:
+                indexes[trash] = _trash_index(trash, top)
+            entries = indexes[trash].get(original)
+            if entries:
+                found = trash, entries.pop(entries.index(max(entries)))[1]
+                break
+        if found is None:
+            failures.append((path, "not found in trash"))
+            continue
+        trash, name = found
+        try:
+            os.makedirs(os.path.dirname(original), exist_ok=True)
+            os.rename(os.path.join(trash, "files", name), original)
+            os.remove(os.path.join(trash, "info", name + ".trashinfo"))
+            restored.append(path)
+        except OSError as e:
+            failures.append((path, str(e)))
+    return restored, failures
+
+
+def restore_batch(batch_id, journal=JOURNAL_FILE):
+    # Restaura lo que queda en la papelera de un lote ("last" = el último con algo que restaurar)
+    batches = [batch for batch in read_batches(journal) if batch.trashed]
+    if batch_id == "last":
+        batch = batches[-1] if batches else None
+    else:
+        batch = next((batch for batch in batches if batch.id == batch_id), None)
+    if batch is None:
+        raise KeyError(batch_id)
+    restored, failures = restore_paths(batch.trashed)
+    with open(journal, "a", encoding="utf-8") as f:
+        for path in restored:
+            _write(f, batch.id, "restore", path)
+        for path, error in failures:
+            _write(f, batch.id, "restore", path, error)
+    return batch.id, restored, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--journal", default=JOURNAL_FILE)
+    parser.add_argument("--restore", metavar="ID", help="restaura un lote (last = el último)")
+    args = parser.parse_args()
+    if args.restore:
+        try:
+            batch_id, restored, failures = restore_batch(args.restore, args.journal)
+        except KeyError:
+            print(f"no hay nada que restaurar en el lote {args.restore}", file=sys.stderr)
+            return 2
+        for path, error in failures:
+            print(f"{path}: {error}", file=sys.stderr)
+        print(f"{batch_id}: {len(restored)} restaurados, {len(failures)} fallos")
+        return 1 if failures else 0
+    for batch in read_batches(args.journal):
+        print(f"{batch.id}  {batch.time}  {len(batch.trashed)} en la papelera, "
+              f"{len(batch.restored)} restaurados, {len(batch.failed)} fallos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
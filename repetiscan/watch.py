@@ -0,0 +1,462 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from repetiscan.contenthash import audio_span, full_hash, partial_hash
+from repetiscan.scanner import ScanError, read_tags
+from repetiscan.similarity import RatioIndex, TokenIndex, id_map
+
+# Modo vigilancia: detecta MP3 añadidos, borrados o modificados bajo la carpeta,
+# lee sólo sus etiquetas y los compara sólo con los candidatos que dan los índices.
+# Con inotify (Linux) se reescanean sólo las carpetas con eventos; si no está
+# disponible, se compara el mtime de cada carpeta con la instantánea anterior.
+
+POLL_SECONDS = 2.0
+# Sin inotify, cada cuántas vueltas se comprueban también tamaño y mtime de todos los
+# archivos (modificar un archivo no cambia el mtime de su carpeta)
+FULL_CHECK_EVERY = 15
+# Archivos modificados hace menos de esto se dejan para la siguiente vuelta (descargas a medias)
+SETTLE_SECONDS = 1.0
+
+Changes = namedtuple("Changes", ["added", "removed", "modified"])
+
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_ONLYDIR = 0x01000000
+_WATCH_MASK = (_IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+               | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    """inotify mediante ctypes; sólo informa de qué carpetas han cambiado."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs = {}
+
+    @classmethod
+    def create(cls):
+        # None si el sistema no tiene inotify
+        if not hasattr(os, "O_CLOEXEC"):
+            return None
+        try:
+            return cls()
+        except (OSError, AttributeError):
+            return None
+
+    def add(self, folder):
+        wd = self._add_watch(self.fd, os.fsencode(folder), _WATCH_MASK)
+        if wd < 0:
+            # ENOSPC: se acabaron las vigilancias (fs.inotify.max_user_watches)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {folder}")
+        self.dirs[wd] = folder
+
+    def read(self, timeout):
+        # (carpetas con eventos, desbordamiento); espera como mucho timeout segundos
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), False
+        dirty, overflow = set(), False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos + _EVENT.size <= len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                folder = self.dirs.get(wd)
+                if folder is not None:
+                    dirty.add(folder)
+                    if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                        dirty.add(os.path.dirname(folder))
+        return dirty, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderSnapshot:
+    """Archivos MP3 (size, mtime_ns) y mtime de cada carpeta bajo folder."""
+
+    def __init__(self, folder, on_new_dir=None):
+        self.folder = folder
+        self.files = {}
+        self.dirs = {}
+        self.dir_files = {}
+        self.on_new_dir = on_new_dir
+
+    def build(self):
+        changes = Changes([], [], [])
+        self._add_tree(self.folder, changes)
+        return changes
+
+    def _list(self, folder):
+        # (mtime de la carpeta, subcarpetas, {path: (size, mtime_ns)}) o None si ya no existe
+        subdirs, files = [], {}
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith('.mp3') and entry.is_file():
+                            st = entry.stat()
+                            files[entry.path] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return mtime, subdirs, files
+
+    def _add_tree(self, folder, changes):
+        stack = [folder]
+        while stack:
+            current = stack.pop()
+            if self.on_new_dir is not None:
+                # Se vigila antes de listar para no perder lo que llegue mientras tanto
+                self.on_new_dir(current)
+            listing = self._list(current)
+            if listing is None:
+                continue
+            mtime, subdirs, files = listing
+            self.dirs[current] = mtime
+            self.dir_files[current] = set()
+            self._update_files(current, files, changes)
+            stack.extend(subdirs)
+
+    def _update_files(self, folder, files, changes):
+        settled = time.time_ns() - int(SETTLE_SECONDS * 1e9)
+        known = self.dir_files[folder]
+        for path in known - files.keys():
+            known.discard(path)
+            del self.files[path]
+            changes.removed.append(path)
+        for path, stat in files.items():
+            old = self.files.get(path)
+            if old == stat:
+                continue
+            if stat[1] > settled:
+                # Aún se está escribiendo: que la carpeta vuelva a revisarse
+                self.dirs[folder] = None
+                continue
+            self.files[path] = stat
+            known.add(path)
+            (changes.added if old is None else changes.modified).append((path,) + stat)
+
+    def _drop_tree(self, folder, changes):
+        prefix = folder + os.sep
+        for current in [d for d in self.dirs if d == folder or d.startswith(prefix)]:
+            for path in self.dir_files.pop(current, ()):
+                del self.files[path]
+                changes.removed.append(path)
+            del self.dirs[current]
+
+    def rescan(self, folder, changes):
+        if folder not in self.dirs:
+            if folder.startswith(self.folder) and os.path.isdir(folder):
+                self._add_tree(folder, changes)
+            return
+        listing = self._list(folder)
+        if listing is None:
+            self._drop_tree(folder, changes)
+            return
+        mtime, subdirs, files = listing
+        self.dirs[folder] = mtime
+        self._update_files(folder, files, changes)
+        prefix = folder + os.sep
+        current = set(subdirs)
+        for sub in [d for d in self.dirs if d.startswith(prefix) and os.sep not in d[len(prefix):]]:
+            if sub not in current:
+                self._drop_tree(sub, changes)
+        for sub in subdirs:
+            if sub not in self.dirs:
+                self._add_tree(sub, changes)
+
+    def changed_dirs(self):
+        # Carpetas cuyo mtime ya no coincide (o que quedaron pendientes)
+        changed = []
+        for folder, mtime in list(self.dirs.items()):
+            try:
+                if os.stat(folder).st_mtime_ns != mtime:
+                    changed.append(folder)
+            except OSError:
+                changed.append(folder)
+        return changed
+
+
+class FolderWatcher:
+    """Hilo que vigila folder y envía a la interfaz los cambios ya comparados.
+
+    events recibe ("changes", rutas borradas, rutas modificadas, [(canción nueva o
+    modificada, [canciones parecidas])], errores) y ("error", e). La sesión ya está
+    actualizada: las modificadas siguen en ella con sus etiquetas nuevas. configure() cambia la sesión y el modo de comparación en marcha.
+    """
+
+    def __init__(self, folder, session, settings, cache=None, use_inotify=True):
+        self.folder = folder
+        self.session = session
+        self.settings = settings
+        self.cache = cache
+        self.events = queue.Queue()
+        self.backend = None
+        self._inotify = Inotify.create() if use_inotify else None
+        self._audio = {}
+        self._hashes = {}
+        self._index = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def configure(self, session, settings):
+        # Se sustituyen de una vez: el hilo lee el par en cada lote
+        self.session, self.settings = session, settings
+
+    def _watch_dir(self, folder):
+        if self._inotify is None:
+            return
+        try:
+            self._inotify.add(folder)
+        except OSError:
+            # Sin más vigilancias disponibles: se sigue comparando mtimes
+            self._inotify.close()
+            self._inotify = None
+
+    def _run(self):
+        try:
+            snapshot = FolderSnapshot(self.folder, self._watch_dir)
+            snapshot.build()
+            self.backend = "inotify" if self._inotify is not None else "mtime"
+            # Lo que cambió entre el análisis y el inicio de la vigilancia
+            paths = set(self.session.songs.paths())
+            known = paths | {error.path for error in self.session.errors}
+            # Los que siguen escribiéndose no están aún en la instantánea, pero no se han borrado
+            changes = Changes([], [path for path in paths if path not in snapshot.files and not os.path.exists(path)], [])
+            for path, (size, mtime) in snapshot.files.items():
+                if path not in known:
+                    changes.added.append((path, size, mtime))
+            self._process(changes)
+            polls = 0
+            while not self._stop.is_set():
+                changes = Changes([], [], [])
+                if self._inotify is not None:
+                    dirty, overflow = self._inotify.read(POLL_SECONDS)
+                    if dirty:
+                        # Se espera a que termine la ráfaga de eventos (copias de álbumes enteros)
+                        self._stop.wait(SETTLE_SECONDS)
+                        more, more_overflow = self._inotify.read(0)
+                        dirty |= more
+                        overflow = overflow or more_overflow
+                    pending = [folder for folder, mtime in snapshot.dirs.items() if mtime is None]
+                    dirty.update(snapshot.dirs if overflow else pending)
+                else:
+                    self._stop.wait(POLL_SECONDS)
+                    polls += 1
+                    dirty = snapshot.dirs if polls % FULL_CHECK_EVERY == 0 else snapshot.changed_dirs()
+                for folder in sorted(dirty):
+                    snapshot.rescan(folder, changes)
+                self.backend = "inotify" if self._inotify is not None else "mtime"
+                if changes.added or changes.removed or changes.modified:
+                    self._process(changes)
+        except Exception as e:
+            self.events.put(("error", e))
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+
+    def _read(self, entries, errors):
+        songs = []
+        for path, size, mtime in entries:
+            cached = self.cache.get(path, size, mtime) if self.cache is not None else None
+            try:
+                title, artist = cached if cached is not None else read_tags(path)
+            except Exception as e:
+                errors.append(ScanError(path, str(e)))
+                continue
+            if cached is None and self.cache is not None:
+                self.cache.put(path, size, mtime, title, artist)
+            songs.append((title, path, artist))
+        if self.cache is not None:
+            self.cache.commit()
+        return songs
+
+    def _process(self, changes):
+        errors = []
+        session, settings = self.session, self.settings
+        known = set(session.songs.paths())
+        # Un archivo modificado (o que ya estaba en la sesión) se quita y se vuelve a añadir
+        modified = [path for path, _, _ in changes.modified + changes.added if path in known]
+        for path in changes.removed + modified:
+            self._audio.pop(path, None)
+            self._hashes.pop(("partial", path), None)
+            self._hashes.pop(("full", path), None)
+        new_songs = self._read(changes.added + changes.modified, errors)
+        with session.lock:
+            index = self._index
+            if index is not None and not index.current(session, settings):
+                # Otra sesión, otros ajustes o canciones quitadas desde la interfaz
+                index = None
+            kept = session.discard(changes.removed + modified) if changes.removed or modified else None
+            if index is not None:
+                index.discard(kept)
+            start = session.add(new_songs)
+            if index is None:
+                index = self._index = MatchIndex(session, settings, self._audio, self._hashes)
+            else:
+                index.add(start)
+            placements = index.placements(start)
+        self.events.put(("changes", changes.removed, modified, placements, errors))
+
+
+class MatchIndex:
+    """Índices del modo de comparación que se conservan entre lotes.
+
+    Trabajan con los ids de la sesión: discard() los renumera con los ids que
+    conserva ScanSession.discard() y add() añade las canciones nuevas del final.
+    Si cambian la sesión o los ajustes hay que crear otro (current() lo dice). Los
+    tamaños de audio y los hashes se guardan por ruta en audio y hashes, que son del
+    vigilante y sobreviven a los cambios de índice.
+    """
+
+    def __init__(self, session, settings, audio, hashes):
+        self.session, self.settings = session, settings
+        self.songs = session.songs
+        self.mode = settings["mode"]
+        self.blacklist = settings["blacklist"]
+        self.excluded = settings.get("excluded", "")
+        self.audio, self.hashes = audio, hashes
+        self.index = None
+        self.groups = {}
+        if self.mode == "ratio":
+            self.index = RatioIndex(session.cleaned(self.blacklist))
+        elif self.mode == "words":
+            self.index = TokenIndex(session.cleaned(self.blacklist), token_sets=session.token_sets(self.blacklist))
+        else:
+            # content: tamaño del audio -> ids; not_artist: título -> ids
+            self._group(range(len(self.songs)))
+        self.size = len(self.songs)
+
+    def current(self, session, settings):
+        return (session is self.session and session.songs is self.songs and len(session.songs) == self.size
+                and settings == self.settings)
+
+    def discard(self, kept):
+        # Después de ScanSession.discard(), con lo que devolvió
+        session = self.session
+        if kept is not None:
+            if self.mode == "ratio":
+                self.index.select(kept, session.cleaned(self.blacklist))
+            elif self.mode == "words":
+                self.index.select(kept, session.token_sets(self.blacklist))
+            else:
+                new_ids = id_map(kept, self.size)
+                groups = {}
+                for key, ids in self.groups.items():
+                    ids = [new_ids[k] for k in ids if new_ids[k] >= 0]
+                    if ids:
+                        groups[key] = ids
+                self.groups = groups
+        self.songs = session.songs
+        self.size = len(self.songs)
+
+    def add(self, start):
+        # Después de ScanSession.add(), con el id de la primera canción nueva
+        session = self.session
+        if self.mode == "ratio":
+            self.index.extend(session.cleaned(self.blacklist))
+        elif self.mode == "words":
+            self.index.extend(session.token_sets(self.blacklist))
+        else:
+            self._group(range(start, len(self.songs)))
+        self.size = len(self.songs)
+
+    def _group(self, ids):
+        songs, groups = self.songs, self.groups
+        for k in ids:
+            if self.mode == "content":
+                start, end = self._span(songs.path(k))
+                if end > start:
+                    groups.setdefault(end - start, []).append(k)
+            elif self.excluded not in (songs.artist(k) or '').lower():
+                # Mismo título exacto, sin el artista excluido (como group_songs_by_title)
+                groups.setdefault(songs.title(k), []).append(k)
+
+    def _span(self, path):
+        if path not in self.audio:
+            try:
+                self.audio[path] = audio_span(path)
+            except OSError:
+                self.audio[path] = (0, 0)
+        return self.audio[path]
+
+    def _hash(self, kind, path):
+        # Igual que iter_content_groups: primero principio y final ("partial"), luego todo
+        key = (kind, path)
+        if key not in self.hashes:
+            start, end = self._span(path)
+            self.hashes[key] = (partial_hash if kind == "partial" else full_hash)(path, start, end)
+        return self.hashes[key]
+
+    def placements(self, start):
+        # [(canción, [canciones existentes o nuevas que cumplen el criterio del modo])] para
+        # las canciones desde start; sólo se comparan los candidatos de los índices
+        songs = self.songs
+        new = range(start, len(songs))
+        matched = {}
+        for i in new:
+            if self.mode == "ratio":
+                matched[i] = [j for j, _ in self.index.matches(i, self.settings["threshold"], after=-1)[0]]
+            elif self.mode == "words":
+                min_overlap = self.settings["min_overlap"]
+                shared = self.index.shared_counts(i, after=-1) if min_overlap > 0 else dict.fromkeys(range(len(songs)), 0)
+                matched[i] = sorted(j for j, count in shared.items() if count >= min_overlap and j != i)
+            elif self.mode == "content":
+                matched[i] = self._same_audio(i)
+            elif self.excluded not in (songs.artist(i) or '').lower():
+                matched[i] = [j for j in self.groups.get(songs.title(i), ()) if j != i]
+        return [(songs[i], [songs[j] for j in matched.get(i, ())]) for i in new]
+
+    def _same_audio(self, i):
+        path = self.songs.path(i)
+        start, end = self._span(path)
+        found = []
+        for j in self.groups.get(end - start, ()) if end > start else ():
+            if j == i:
+                continue
+            other = self.songs.path(j)
+            try:
+                if self._hash("partial", other) == self._hash("partial", path) and \
+                        self._hash("full", other) == self._hash("full", path):
+                    found.append(j)
+            except (OSError, ValueError):
+                continue
+        return found